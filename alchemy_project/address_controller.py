@@ -3,6 +3,7 @@ from uuid import UUID
 from address_service import AddressService
 from litestar import Controller, delete, get, post, put
 from litestar.params import Body, Parameter
+from pagination import CountMode, fetch_page, next_cursor
 from schemas import AddressCreate, AddressResponse, AddressUpdate
 
 
@@ -17,6 +18,15 @@ class AddressController(Controller):
         """Get address by ID"""
         return await address_service.get_by_id(address_id)
 
+    @get("/batch")
+    async def get_addresses_batch(
+        self,
+        address_service: AddressService,
+        ids: list[UUID] = Parameter(min_items=1, max_items=100),
+    ) -> list[AddressResponse]:
+        """Get several addresses by ID, unknown IDs are skipped"""
+        return await address_service.get_by_ids(ids)
+
     @get("/get_user_addresses/{user_id:uuid}")
     async def get_addresses_by_user_id(
         self, address_service: AddressService, user_id: UUID
@@ -24,16 +34,26 @@ class AddressController(Controller):
         """Get all addresses for a specific user"""
         return await address_service.get_by_user_id(user_id)
 
+    @get("/get_primary_address/{user_id:uuid}")
+    async def get_primary_address(
+        self, address_service: AddressService, user_id: UUID
+    ) -> AddressResponse:
+        """Get the primary address of a user"""
+        return await address_service.get_primary_by_user_id(user_id)
+
     @get("/get_all_addresses")
     async def get_all_addresses(
         self,
         address_service: AddressService,
         count: int = Parameter(gt=0, le=100, default=10),
         page: int = Parameter(gt=0, default=1),
+        cursor: str | None = Parameter(default=None),
         user_id: UUID | None = Parameter(default=None),
         city: str | None = Parameter(default=None),
         country: str | None = Parameter(default=None),
         is_primary: bool | None = Parameter(default=None),
+        with_total: bool = Parameter(default=True),
+        count_mode: CountMode = Parameter(default="separate"),
     ) -> dict:
         """Get all addresses with pagination and filtering"""
         filters = {}
@@ -46,16 +66,17 @@ class AddressController(Controller):
         if is_primary is not None:
             filters["is_primary"] = is_primary
 
-        addresses = await address_service.get_by_filter(
-            count=count, page=page, **filters
+        addresses, total_count, total_is_estimate = await fetch_page(
+            address_service, count, page, cursor, with_total, count_mode, filters
         )
-        total_count = await address_service.get_total_count(**filters)
 
         return {
             "addresses": addresses,
             "total_count": total_count,
+            "total_is_estimate": total_is_estimate,
             "page": page,
             "count": count,
+            "next_cursor": next_cursor(addresses, count),
         }
 
     @post("/create_address")
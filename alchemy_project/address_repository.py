@@ -1,16 +1,17 @@
-from typing import List, Optional
+from typing import Collection, List, Optional
 from uuid import UUID
 
+from base_repository import BaseRepository
+from litestar.exceptions import ClientException
 from schemas import AddressCreate, AddressUpdate
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
-from tables import Address
+from tables import Address, Order
 
 
-class AddressRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+class AddressRepository(BaseRepository):
+    model = Address
 
     async def get_by_id(
         self, address_id: UUID, include_user: bool = False
@@ -31,33 +32,23 @@ class AddressRepository:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def get_primary_by_user_id(self, user_id: UUID) -> Optional[Address]:
+        # Поиск по частичному уникальному индексу uq_addresses_user_id_primary
+        result = await self.session.execute(
+            select(Address).where(Address.user_id == user_id, Address.is_primary)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_filter(
-        self, count: int = 10, page: int = 1, **kwargs
+        self, count: int = 10, page: int = 1, cursor: Optional[str] = None, **kwargs
     ) -> List[Address]:
-        offset = (page - 1) * count
-        query = select(Address)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Address, key):
-                    query = query.where(getattr(Address, key) == value)
-
-        query = query.offset(offset).limit(count)
+        query = self._apply_filters(select(Address), **kwargs)
+        query = self._paginate(query, count, page, cursor)
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def get_total_count(self, **kwargs) -> int:
-        query = select(Address)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Address, key):
-                    query = query.where(getattr(Address, key) == value)
-
-        result = await self.session.execute(query)
-        return len(result.scalars().all())
-
-    async def create(self, address_data: AddressCreate) -> Address:
+    async def create(self, address_data: AddressCreate) -> tuple[Address, List[UUID]]:
+        """Создает адрес, вторым значением - id адресов, с которых снят is_primary"""
         address = Address(
             user_id=address_data.user_id,
             street=address_data.street,
@@ -68,55 +59,75 @@ class AddressRepository:
             is_primary=address_data.is_primary,
         )
 
-        # Если это основной адрес, снимаем флаг is_primary у других адресов пользователя
+        # Если это основной адрес, снимаем флаг is_primary у других адресов
+        # пользователя в той же транзакции, что и вставка нового
+        demoted_ids = []
         if address_data.is_primary:
-            await self._unset_primary_for_user(address_data.user_id)
+            demoted_ids = await self._unset_primary_for_user(address_data.user_id)
 
         self.session.add(address)
-        await self.session.commit()
+        await self._commit_primary_switch(address_data.is_primary)
         await self.session.refresh(address)
-        return address
+        return address, demoted_ids
 
     async def update(
         self, address_id: UUID, address_data: AddressUpdate
-    ) -> Optional[Address]:
-        address = await self.get_by_id(address_id)
-        if not address:
-            return None
-
+    ) -> tuple[Optional[Address], List[UUID]]:
+        """Обновляет адрес, вторым значением - id адресов, с которых снят is_primary"""
         update_data = address_data.model_dump(exclude_unset=True)
 
         # Если устанавливаем is_primary=True, снимаем флаг у других адресов пользователя
+        demoted_ids = []
         if update_data.get("is_primary", False):
-            await self._unset_primary_for_user(address.user_id)
+            owner_id = select(Address.user_id).where(Address.id == address_id)
+            demoted_ids = await self._unset_primary_for_user(owner_id.scalar_subquery())
 
-        for field, value in update_data.items():
-            setattr(address, field, value)
+        address = await self._update_returning(address_id, update_data)
+        await self._commit_primary_switch(update_data.get("is_primary", False))
+        return address, demoted_ids
 
-        await self.session.commit()
-        await self.session.refresh(address)
-        return address
+    async def get_order_ids(self, address_ids: Collection[UUID]) -> List[UUID]:
+        """id заказов с этими адресами доставки"""
+        result = await self.session.execute(
+            select(Order.id).where(Order.delivery_address_id.in_(address_ids))
+        )
+        return list(result.scalars().all())
 
     async def delete(self, address_id: UUID) -> bool:
-        address = await self.get_by_id(address_id)
-        if not address:
-            return False
-
-        await self.session.delete(address)
-        await self.session.commit()
-        return True
-
-    async def _unset_primary_for_user(self, user_id: UUID) -> None:
-        """Снимает флаг is_primary у всех адресов пользователя"""
+        deleted = await self._delete_returning(address_id)
+        await self._commit()
+        return deleted
+
+    async def _commit_primary_switch(self, is_primary: bool) -> None:
+        """Коммит с переводом гонки за основной адрес в 409.
+
+        Два одновременных переключения упираются в частичный уникальный
+        индекс (user_id) WHERE is_primary, второе откатывается
+        """
+        try:
+            await self._commit()
+        except IntegrityError as e:
+            await self._rollback()
+            if not is_primary:
+                raise
+            raise ClientException(
+                status_code=409,
+                detail="Primary address was changed concurrently, retry the request",
+            ) from e
+
+    async def _unset_primary_for_user(self, user_id) -> List[UUID]:
+        """Снимает флаг is_primary у всех адресов пользователя одним UPDATE.
+
+        Флаг снимается отдельным запросом до установки нового: уникальный
+        индекс проверяется построчно, и одиночный UPDATE, переставляющий оба
+        флага, может упасть в зависимости от порядка строк. Возвращает id
+        измененных адресов - их кэш нужно сбросить
+        """
         result = await self.session.execute(
-            select(Address).where(
-                (Address.user_id == user_id) & (Address.is_primary == True)
-            )
+            update(Address)
+            .where(Address.user_id == user_id, Address.is_primary == True)
+            .values(is_primary=False)
+            .returning(Address.id)
+            .execution_options(synchronize_session=False)
         )
-        addresses = result.scalars().all()
-
-        for addr in addresses:
-            addr.is_primary = False
-
-        if addresses:
-            await self.session.commit()
+        return list(result.scalars().all())
@@ -2,14 +2,20 @@ from typing import List, Optional
 from uuid import UUID
 
 from address_repository import AddressRepository
+from cache import EntityCache, cache_ttl, cached, invalidate_committed, invalidates
+from dto import AddressRow, to_structs
 from litestar.exceptions import NotFoundException
+from order_service import order_cache
 from schemas import AddressCreate, AddressResponse, AddressUpdate
 
+address_cache = EntityCache("address", AddressResponse, ttl=cache_ttl("address", 3600))
+
 
 class AddressService:
     def __init__(self, repository: AddressRepository):
         self.repository = repository
 
+    @cached(address_cache)
     async def get_by_id(self, address_id: UUID) -> AddressResponse:
         """Получить адрес по ID"""
         address = await self.repository.get_by_id(address_id, include_user=True)
@@ -17,40 +23,89 @@ class AddressService:
             raise NotFoundException(detail=f"Address with ID {address_id} not found")
         return AddressResponse.model_validate(address)
 
+    async def get_by_ids(self, address_ids: List[UUID]) -> List[AddressResponse]:
+        """Получить несколько адресов: кэш одним MGET, промахи одним запросом"""
+        return await address_cache.get_many_or_load(address_ids, self._load_by_ids)
+
+    async def _load_by_ids(
+        self, address_ids: List[UUID]
+    ) -> dict[UUID, AddressResponse]:
+        addresses = await self.repository.get_by_ids(address_ids)
+        return {
+            address.id: AddressResponse.model_validate(address) for address in addresses
+        }
+
     async def get_by_user_id(self, user_id: UUID) -> List[AddressResponse]:
         """Получить все адреса пользователя"""
         addresses = await self.repository.get_by_user_id(user_id, include_user=True)
         return [AddressResponse.model_validate(addr) for addr in addresses]
 
+    async def get_primary_by_user_id(self, user_id: UUID) -> AddressResponse:
+        """Получить основной адрес пользователя"""
+        address = await self.repository.get_primary_by_user_id(user_id)
+        if not address:
+            raise NotFoundException(
+                detail=f"Primary address for user {user_id} not found"
+            )
+        return AddressResponse.model_validate(address)
+
     async def get_by_filter(
         self, count: int = 10, page: int = 1, **kwargs
-    ) -> List[AddressResponse]:
+    ) -> List[AddressRow]:
         """Получить адреса с фильтрацией"""
         addresses = await self.repository.get_by_filter(
             count=count, page=page, **kwargs
         )
-        return [AddressResponse.model_validate(addr) for addr in addresses]
+        return to_structs(addresses, AddressRow)
+
+    async def get_by_filter_with_total(
+        self, count: int = 10, page: int = 1, **kwargs
+    ) -> tuple[List[AddressRow], Optional[int]]:
+        """Получить адреса и их общее количество одним запросом"""
+        addresses, total = await self.repository.get_by_filter_with_total(
+            count=count, page=page, **kwargs
+        )
+        return to_structs(addresses, AddressRow), total
 
     async def get_total_count(self, **kwargs) -> int:
         """Получить общее количество адресов"""
         return await self.repository.get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs) -> tuple[int, bool]:
+        """Общее количество адресов, всегда точное"""
+        return await self.get_total_count(**kwargs), False
+
     async def create(self, address_data: AddressCreate) -> AddressResponse:
         """Создать новый адрес"""
-        address = await self.repository.create(address_data)
+        address, demoted_ids = await self.repository.create(address_data)
+        if demoted_ids:
+            await invalidate_committed(address_cache, demoted_ids)
+            await self._invalidate_orders(demoted_ids)
         return AddressResponse.model_validate(address)
 
+    @invalidates(address_cache)
     async def update(
         self, address_id: UUID, address_data: AddressUpdate
     ) -> AddressResponse:
         """Обновить адрес"""
-        address = await self.repository.update(address_id, address_data)
+        address, demoted_ids = await self.repository.update(address_id, address_data)
         if not address:
             raise NotFoundException(detail=f"Address with ID {address_id} not found")
+        await invalidate_committed(address_cache, demoted_ids)
+        await self._invalidate_orders([address_id, *demoted_ids])
         return AddressResponse.model_validate(address)
 
+    @invalidates(address_cache)
     async def delete(self, address_id: UUID) -> None:
         """Удалить адрес"""
+        # Заказы с этим адресом удалит ON DELETE CASCADE
+        order_ids = await self.repository.get_order_ids([address_id])
         success = await self.repository.delete(address_id)
         if not success:
             raise NotFoundException(detail=f"Address with ID {address_id} not found")
+        await invalidate_committed(order_cache, order_ids)
+
+    async def _invalidate_orders(self, address_ids: List[UUID]) -> None:
+        """Сбросить кэш заказов, в которые встроены измененные адреса"""
+        order_ids = await self.repository.get_order_ids(address_ids)
+        await invalidate_committed(order_cache, order_ids)
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Any, Collection, Optional
+
+from pagination import decode_cursor
+from sqlalchemy import Select, delete, func, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from unit_of_work import active_unit_of_work
+
+
+class BaseRepository:
+    """Общая часть репозиториев: фильтрация и подсчёт строк на стороне БД"""
+
+    model: Any = None
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _commit(self) -> None:
+        """commit, а внутри UnitOfWork - только flush: фиксирует она сама"""
+        if active_unit_of_work(self.session):
+            await self.session.flush()
+        else:
+            await self.session.commit()
+
+    async def _rollback(self) -> None:
+        # Внутри UnitOfWork откат делает она при выходе из блока
+        if not active_unit_of_work(self.session):
+            await self.session.rollback()
+
+    def _filter_conditions(self, **kwargs) -> list:
+        """Условия WHERE для фильтров get_by_filter и get_total_count"""
+        columns = self.model.__table__.columns
+        return [
+            getattr(self.model, key) == value
+            for key, value in kwargs.items()
+            if key in columns
+        ]
+
+    def _load_options(self, include: Collection[str]) -> list:
+        """Опции загрузки связей для include, у большинства моделей их нет"""
+        return []
+
+    def _apply_filters(self, query: Select, **kwargs) -> Select:
+        conditions = self._filter_conditions(**kwargs)
+        if conditions:
+            query = query.where(*conditions)
+        return query
+
+    def _paginate(
+        self, query: Select, count: int, page: int, cursor: Optional[str] = None
+    ) -> Select:
+        """Сортировка по (created_at, id) и выбор страницы.
+
+        С курсором выборка продолжается строго после последней строки
+        предыдущей страницы (keyset), page при этом не используется
+        """
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        if cursor:
+            created_at, entity_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(self.model.created_at, self.model.id) < (created_at, entity_id)
+            )
+        else:
+            query = query.offset((page - 1) * count)
+        return query.limit(count)
+
+    async def _update_returning(self, entity_id, values: dict) -> Any:
+        """UPDATE ... RETURNING одним запросом вместо SELECT + UPDATE + refresh.
+
+        updated_at берется из тех же часов, что и default/onupdate колонок
+        (datetime.now приложения), а не из now() сервера: иначе в колонке
+        смешались бы два источника времени. Коммит остается за вызывающим методом
+        """
+        if "updated_at" in self.model.__table__.columns:
+            values = {**values, "updated_at": datetime.now()}
+        if not values:
+            return await self.session.get(self.model, entity_id)
+
+        result = await self.session.execute(
+            update(self.model)
+            .where(self.model.id == entity_id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def _delete_returning(self, entity_id) -> bool:
+        """DELETE ... RETURNING id, зависимые строки удаляет ON DELETE CASCADE"""
+        result = await self.session.execute(
+            delete(self.model)
+            .where(self.model.id == entity_id)
+            .returning(self.model.id)
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def get_by_ids(self, ids: Collection) -> list:
+        """Строки с указанными id одним запросом WHERE id IN (...)"""
+        if not ids:
+            return []
+        result = await self.session.execute(
+            select(self.model).where(self.model.id.in_(ids))
+        )
+        return list(result.scalars().all())
+
+    async def get_by_filter_with_total(
+        self, count: int = 10, page: int = 1, include: Collection[str] = (), **kwargs
+    ) -> tuple[list, Optional[int]]:
+        """Страница и общее число строк под фильтром одним запросом.
+
+        count(*) OVER () считается до LIMIT/OFFSET. Postgres при этом
+        проходит все подходящие строки, поэтому на больших выборках
+        отдельный COUNT по индексу может оказаться быстрее
+        """
+        total = func.count().over().label("total_count")
+        query = self._apply_filters(select(self.model, total), **kwargs)
+        query = self._paginate(query, count, page)
+        query = query.options(*self._load_options(include))
+        rows = (await self.session.execute(query)).all()
+        if not rows:
+            # За последней страницей строк нет, и число неизвестно
+            return [], 0 if page == 1 else None
+        return [row[0] for row in rows], rows[0].total_count
+
+    async def get_total_count(self, **kwargs) -> int:
+        # COUNT(*) считается в Postgres, строки в память не загружаются
+        query = self._apply_filters(
+            select(func.count()).select_from(self.model), **kwargs
+        )
+        return await self.session.scalar(query)
+
+    async def estimate_total_count(self) -> Optional[int]:
+        """Оценка числа строк таблицы из статистики планировщика.
+
+        Читает pg_class.reltuples за время, не зависящее от размера таблицы.
+        None - если база не Postgres или таблица еще не анализировалась
+        """
+        if self.session.bind.dialect.name != "postgresql":
+            return None
+        estimate = await self.session.scalar(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = CAST(:table AS regclass)"
+            ),
+            {"table": self.model.__tablename__},
+        )
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
@@ -0,0 +1,126 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from unit_of_work import active_unit_of_work
+
+# Сколько ждать остальные запросы перед отправкой пачки, в секундах
+BATCH_LOADER_WINDOW = float(os.getenv("BATCH_LOADER_WINDOW", 0.001))
+BATCH_LOADER_MAX_SIZE = int(os.getenv("BATCH_LOADER_MAX_SIZE", 100))
+
+
+class BatchLoader:
+    """Объединяет поиск по id из параллельных корутин воркера (DataLoader).
+
+    Запросы, пришедшие за окно window, уходят одним вызовом
+    load_many(ids) с уникальными id. Пачка отправляется раньше, если
+    набралось max_size id. Загрузчик живет весь срок воркера, поэтому
+    объединяются и запросы разных HTTP-запросов, а не только одного
+    """
+
+    def __init__(
+        self,
+        load_many: Callable[[list], Awaitable[dict[Hashable, Any]]],
+        window: float = BATCH_LOADER_WINDOW,
+        max_size: int = BATCH_LOADER_MAX_SIZE,
+    ):
+        self.load_many = load_many
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        # Сколько корутин ждет каждый future
+        self._waiters: dict[asyncio.Future, int] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.coalesced = 0
+
+    async def load(self, key: Hashable) -> Any:
+        """Значение по id или None, если его нет"""
+        future = self._pending.get(key)
+        if future is None or future.cancelled():
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        else:
+            self.coalesced += 1
+
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            # shield: отмена одного запроса не отменяет загрузку для остальных
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+                # Все ожидающие отменены: результат или ошибку пачки
+                # получать некому, иначе asyncio пишет в лог
+                # "Future exception was never retrieved"
+                future.cancel()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        try:
+            values = await self.load_many(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done() and not future.cancelled():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "coalesced": self.coalesced}
+
+
+async def load_by_id(loader: Optional[BatchLoader], repository: Any, entity_id) -> Any:
+    """repository.get_by_id(entity_id) через загрузчик, если он задан.
+
+    Внутри UnitOfWork читаем сессией репозитория: пачка загрузчика идет
+    в другой сессии и не видит незафиксированных изменений
+    """
+    if loader is None or active_unit_of_work(repository.session):
+        return await repository.get_by_id(entity_id)
+    return await loader.load(entity_id)
+
+
+def repository_loader(
+    session_factory: async_sessionmaker,
+    repository_class: type,
+    schema: type[BaseModel],
+    **options,
+) -> BatchLoader:
+    """BatchLoader поверх repository.get_by_ids.
+
+    Пачка собирается из разных запросов, поэтому у нее своя короткая
+    сессия из фабрики, а не сессия какого-то одного запроса. Строки
+    превращаются в схему ответа до закрытия сессии
+    """
+
+    async def load_many(ids: list) -> dict:
+        async with session_factory() as session:
+            rows = await repository_class(session).get_by_ids(ids)
+            return {row.id: schema.model_validate(row) for row in rows}
+
+    return BatchLoader(load_many, **options)
@@ -0,0 +1,60 @@
+"""Стоимость ответа при попадании в кэш продукта.
+
+model: из Redis приходит JSON, он разбирается в ProductResponse, а
+Litestar снова кодирует модель в JSON (прежний путь get_product_by_id).
+bytes: JSON из Redis отдается в ответ как есть (get_or_load_json).
+Redis не нужен - замеряется только работа процессора над значением.
+
+Запуск из каталога alchemy_project: python benchmarks/bench_cache_hit.py
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+import common  # noqa: F401 - добавляет alchemy_project в sys.path
+from litestar.serialization import encode_json, get_serializer
+from pydantic import BaseModel
+from schemas import ProductResponse
+
+REPEAT = 100_000
+
+pydantic_serializer = get_serializer(
+    {BaseModel: lambda model: model.model_dump(mode="json")}
+)
+
+cached = (
+    ProductResponse(
+        id=uuid.uuid4(),
+        name="Продукт",
+        description="Описание продукта для замера попадания в кэш",
+        price=99.9,
+        category="Бенчмарк",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+    .model_dump_json()
+    .encode()
+)
+
+
+def via_model() -> bytes:
+    product = ProductResponse.model_validate_json(cached)
+    return encode_json(product, serializer=pydantic_serializer)
+
+
+def via_bytes() -> bytes:
+    return cached
+
+
+def main():
+    for name, respond in (("model", via_model), ("bytes", via_bytes)):
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            respond()
+        elapsed = (time.perf_counter() - started) / REPEAT * 1_000_000
+        print(f"{name:>5}: {elapsed:.2f} мкс на попадание")
+
+
+if __name__ == "__main__":
+    main()
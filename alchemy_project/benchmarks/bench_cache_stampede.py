@@ -0,0 +1,76 @@
+"""Лавина промахов кэша: N одновременных запросов к одному истекшему ключу.
+
+Сравнивается прежний read-through (каждый промах идет в базу) и
+single-flight в EntityCache.get_or_load. Redis не нужен - кэш работает
+только с L1, загрузка из базы имитируется задержкой.
+
+Запуск из каталога alchemy_project: python benchmarks/bench_cache_stampede.py
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import common  # noqa: F401
+from cache import EntityCache
+from schemas import ProductResponse
+
+CONCURRENCY = [10, 100, 1000]
+LOAD_DELAY = 0.02
+
+
+def make_loader(product_id, counter: list):
+    async def loader():
+        counter.append(1)
+        await asyncio.sleep(LOAD_DELAY)
+        return ProductResponse(
+            id=product_id,
+            name="Bench",
+            price=1.0,
+            category="Bench",
+            created_at="2026-01-01T00:00:00",
+            updated_at="2026-01-01T00:00:00",
+        )
+
+    return loader
+
+
+async def legacy_get_or_load(cache: EntityCache, entity_id, loader):
+    cached = await cache.get(entity_id)
+    if cached is not None:
+        return cached
+    value = await loader()
+    await cache.set(entity_id, value)
+    return value
+
+
+async def run(concurrency: int, get_or_load) -> tuple[int, float]:
+    cache = EntityCache(f"bench_{uuid4()}", ProductResponse, ttl=60)
+    product_id = uuid4()
+    counter = []
+    loader = make_loader(product_id, counter)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(get_or_load(cache, product_id, loader) for _ in range(concurrency))
+    )
+    return len(counter), (time.perf_counter() - started) * 1000
+
+
+async def main():
+    with patch("redis_client.get_redis_client", AsyncMock(return_value=None)):
+        for concurrency in CONCURRENCY:
+            legacy_loads, legacy_ms = await run(concurrency, legacy_get_or_load)
+            flight_loads, flight_ms = await run(
+                concurrency, lambda cache, *args: cache.get_or_load(*args)
+            )
+            print(
+                f"{concurrency:>5} запросов: "
+                f"read-through {legacy_loads} загрузок {legacy_ms:.1f} мс, "
+                f"single-flight {flight_loads} загрузок {flight_ms:.1f} мс"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
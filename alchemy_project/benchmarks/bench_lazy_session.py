@@ -0,0 +1,84 @@
+"""Стоимость сессии БД для запросов, обслуженных из кэша.
+
+Прежний provide_db_session создавал AsyncSession на каждый запрос,
+LazySession - только при первом обращении к БД. Для каждого варианта
+выполняется CONCURRENCY одновременных "запросов", из которых доля
+HIT_RATE отвечает из кэша, остальные делают SELECT по первичному ключу.
+
+Запуск из каталога alchemy_project: python benchmarks/bench_lazy_session.py
+"""
+
+import asyncio
+import contextlib
+import time
+
+import common
+from database import LazySession
+from sqlalchemy import event, select
+from tables import Product
+
+REQUESTS = 20_000
+CONCURRENCY = 100
+HIT_RATE = 0.9
+
+
+@contextlib.asynccontextmanager
+async def eager_session(session_factory):
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+@contextlib.asynccontextmanager
+async def lazy_session(session_factory):
+    session = LazySession(session_factory)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def handle(provide, session_factory, request_no: int):
+    async with provide(session_factory) as session:
+        if request_no % 100 < HIT_RATE * 100:
+            return None
+        return await session.scalar(select(Product.id).limit(1))
+
+
+async def run(provide, session_factory) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request(request_no):
+        async with semaphore:
+            await handle(provide, session_factory, request_no)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request(n) for n in range(REQUESTS)))
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    async with common.bench_session_factory() as session_factory:
+        checkouts = 0
+
+        def on_checkout(*args):
+            nonlocal checkouts
+            checkouts += 1
+
+        engine = session_factory.kw["bind"]
+        event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+
+        for name, provide in (("eager", eager_session), ("lazy", lazy_session)):
+            checkouts = 0
+            elapsed = await run(provide, session_factory)
+            print(
+                f"{name:>5}: {REQUESTS} запросов, попаданий {HIT_RATE:.0%}, "
+                f"{elapsed:.0f} мс, {REQUESTS / elapsed * 1000:.0f} req/s, "
+                f"checkout из пула {checkouts}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Время и число SQL-запросов OrderRepository.create в зависимости от размера заказа
+
+Сравнивается старая схема (отдельный SELECT цены на каждую позицию)
+с текущей (все цены одним WHERE id IN (...)).
+
+Запуск из каталога alchemy_project:
+    python benchmarks/bench_order_create.py
+"""
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from common import bench_session_factory, timed
+from order_repository import OrderRepository
+from schemas import OrderCreate, OrderItemBase
+from sqlalchemy import event, insert, select
+from tables import Order, OrderItem, Product
+
+ITEM_COUNTS = (1, 10, 50, 200)
+
+
+async def legacy_create(session, order_data: OrderCreate) -> Order:
+    """Старая реализация: SELECT Product на каждую позицию заказа"""
+    order = Order(
+        user_id=order_data.user_id,
+        delivery_address_id=order_data.delivery_address_id,
+        status=order_data.status,
+        total_amount=0.0,
+    )
+    session.add(order)
+    await session.flush()
+
+    total_amount = 0.0
+    for item_data in order_data.items:
+        product_result = await session.execute(
+            select(Product).where(Product.id == item_data.product_id)
+        )
+        product = product_result.scalar_one()
+        session.add(
+            OrderItem(
+                order_id=order.id,
+                product_id=item_data.product_id,
+                quantity=item_data.quantity,
+                unit_price=product.price,
+            )
+        )
+        total_amount += product.price * item_data.quantity
+
+    order.total_amount = total_amount
+    await session.commit()
+    await session.refresh(order)
+    return order
+
+
+async def batch_create(session, order_data: OrderCreate) -> Order:
+    return await OrderRepository(session).create(order_data)
+
+
+async def seed_products(session, total: int) -> list:
+    now = datetime.now()
+    rows = [
+        {
+            "id": uuid4(),
+            "name": f"product_{i}",
+            "price": 10.0 + i,
+            "category": "bench",
+            "in_stock": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(total)
+    ]
+    await session.execute(insert(Product), rows)
+    await session.commit()
+    return [row["id"] for row in rows]
+
+
+async def main() -> None:
+    async with bench_session_factory() as session_factory:
+        async with session_factory() as session:
+            product_ids = await seed_products(session, max(ITEM_COUNTS))
+
+        statements = []
+        print(
+            f"{'items':>6} | {'legacy ms':>9} | {'legacy SQL':>10} "
+            f"| {'batch ms':>8} | {'batch SQL':>9}"
+        )
+        for item_count in ITEM_COUNTS:
+            order_data = OrderCreate(
+                user_id=uuid4(),
+                delivery_address_id=uuid4(),
+                items=[
+                    OrderItemBase(product_id=product_id, quantity=2, unit_price=1.0)
+                    for product_id in product_ids[:item_count]
+                ],
+            )
+            row = []
+            for create in (legacy_create, batch_create):
+                async with session_factory() as session:
+                    engine = session.bind.sync_engine
+
+                    def on_execute(conn, cursor, statement, *args):
+                        statements.append(statement)
+
+                    event.listen(engine, "before_cursor_execute", on_execute)
+                    statements.clear()
+                    await create(session, order_data)
+                    sql_count = len(statements)
+                    event.remove(engine, "before_cursor_execute", on_execute)
+
+                    elapsed = await timed(lambda: create(session, order_data))
+                    row.extend((elapsed, sql_count))
+
+            print(
+                f"{item_count:>6} | {row[0]:>9.1f} | {row[1]:>10} "
+                f"| {row[2]:>8.1f} | {row[3]:>9}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
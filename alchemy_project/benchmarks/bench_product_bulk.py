@@ -0,0 +1,46 @@
+"""Скорость загрузки каталога: create() по одному продукту против bulk_create()
+
+Запуск из каталога alchemy_project:
+    python benchmarks/bench_product_bulk.py
+"""
+
+import asyncio
+import time
+
+from common import bench_session_factory
+from product_repository import ProductRepository
+from schemas import ProductCreate
+
+SINGLE_ROWS = 500
+BULK_ROWS = 20_000
+
+
+def make_products(total: int) -> list[ProductCreate]:
+    return [
+        ProductCreate(name=f"product_{i}", price=1.0 + i, category="bench")
+        for i in range(total)
+    ]
+
+
+async def main() -> None:
+    async with bench_session_factory() as session_factory:
+        async with session_factory() as session:
+            repository = ProductRepository(session)
+
+            products = make_products(SINGLE_ROWS)
+            started = time.perf_counter()
+            for product in products:
+                await repository.create(product)
+            single_rate = SINGLE_ROWS / (time.perf_counter() - started)
+
+            products = make_products(BULK_ROWS)
+            started = time.perf_counter()
+            await repository.bulk_create(products)
+            bulk_rate = BULK_ROWS / (time.perf_counter() - started)
+
+    print(f"create():      {single_rate:>9.0f} rows/s ({SINGLE_ROWS} rows)")
+    print(f"bulk_create(): {bulk_rate:>9.0f} rows/s ({BULK_ROWS} rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
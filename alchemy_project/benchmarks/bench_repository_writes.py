@@ -0,0 +1,135 @@
+"""update/delete в репозиториях: старая схема против UPDATE/DELETE ... RETURNING
+
+Старая схема: SELECT, setattr, COMMIT, refresh (SELECT) - для удаления
+SELECT + DELETE. Новая - один запрос с RETURNING. Для каждого варианта
+выводится среднее время операции, число SQL-запросов и время, на которое
+операция занимает соединение из пула.
+
+Для реальных цифр задержек нужен Postgres (BENCH_DATABASE_URL), на sqlite
+в памяти сетевых round trip нет и разница меньше.
+
+Запуск из каталога alchemy_project:
+    python benchmarks/bench_repository_writes.py
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from common import bench_session_factory
+from product_repository import ProductRepository
+from schemas import ProductUpdate
+from sqlalchemy import event, insert, select
+from tables import Product
+
+OPERATIONS = 500
+
+
+async def legacy_update(session, product_id, product_data: ProductUpdate):
+    result = await session.execute(select(Product).where(Product.id == product_id))
+    product = result.scalar_one_or_none()
+    for field, value in product_data.model_dump(exclude_unset=True).items():
+        setattr(product, field, value)
+    await session.commit()
+    await session.refresh(product)
+    return product
+
+
+async def legacy_delete(session, product_id, _=None):
+    result = await session.execute(select(Product).where(Product.id == product_id))
+    product = result.scalar_one_or_none()
+    await session.delete(product)
+    await session.commit()
+    return True
+
+
+async def returning_update(session, product_id, product_data: ProductUpdate):
+    return await ProductRepository(session).update(product_id, product_data)
+
+
+async def returning_delete(session, product_id, _=None):
+    return await ProductRepository(session).delete(product_id)
+
+
+async def seed_products(session_factory, total: int) -> list:
+    now = datetime.now()
+    rows = [
+        {
+            "id": uuid4(),
+            "name": f"product_{i}",
+            "price": 10.0,
+            "category": "bench",
+            "in_stock": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(total)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(Product), rows)
+        await session.commit()
+    return [row["id"] for row in rows]
+
+
+async def measure(session_factory, operation, product_ids) -> tuple:
+    statements = 0
+    hold_time = 0.0
+    checked_out = {}
+
+    def on_execute(*args):
+        nonlocal statements
+        statements += 1
+
+    def on_checkout(dbapi_conn, record, proxy):
+        checked_out[id(record)] = time.perf_counter()
+
+    def on_checkin(dbapi_conn, record):
+        nonlocal hold_time
+        started = checked_out.pop(id(record), None)
+        if started is not None:
+            hold_time += time.perf_counter() - started
+
+    async with session_factory() as session:
+        engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine.pool, "checkout", on_checkout)
+    event.listen(engine.pool, "checkin", on_checkin)
+
+    product_data = ProductUpdate(price=20.0)
+    started = time.perf_counter()
+    for product_id in product_ids:
+        async with session_factory() as session:
+            await operation(session, product_id, product_data)
+    elapsed = time.perf_counter() - started
+
+    event.remove(engine, "before_cursor_execute", on_execute)
+    event.remove(engine.pool, "checkout", on_checkout)
+    event.remove(engine.pool, "checkin", on_checkin)
+
+    count = len(product_ids)
+    return (
+        elapsed / count * 1000,
+        statements / count,
+        hold_time / count * 1000,
+    )
+
+
+async def main() -> None:
+    async with bench_session_factory() as session_factory:
+        print(
+            f"{'operation':>18} | {'ms/op':>6} | {'SQL/op':>6} | {'conn held ms':>12}"
+        )
+        for name, operation in (
+            ("legacy update", legacy_update),
+            ("returning update", returning_update),
+            ("legacy delete", legacy_delete),
+            ("returning delete", returning_delete),
+        ):
+            product_ids = await seed_products(session_factory, OPERATIONS)
+            ms, sql, held = await measure(session_factory, operation, product_ids)
+            print(f"{name:>18} | {ms:>6.2f} | {sql:>6.1f} | {held:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Сериализация страницы списка: pydantic против структур msgspec.
+
+pydantic: ProductResponse.model_validate для каждой строки, затем
+Litestar кодирует модели через model_dump (как плагин pydantic).
+msgspec: to_structs одним вызовом и прямое кодирование Struct в JSON.
+Строки - объекты ORM в памяти, база не нужна.
+
+Запуск из каталога alchemy_project: python benchmarks/bench_serialization.py
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+import common  # noqa: F401 - добавляет alchemy_project в sys.path
+from dto import ProductRow, to_structs
+from litestar.serialization import encode_json, get_serializer
+from pydantic import BaseModel
+from schemas import ProductResponse
+from tables import Product
+
+PAGE_SIZES = (10, 100, 1000)
+REPEAT = 200
+
+pydantic_serializer = get_serializer(
+    {BaseModel: lambda model: model.model_dump(mode="json")}
+)
+
+
+def make_rows(count: int) -> list[Product]:
+    now = datetime.now()
+    return [
+        Product(
+            id=uuid.uuid4(),
+            name=f"Продукт {i}",
+            description="Описание продукта для замера сериализации",
+            price=10.0 + i,
+            category="Бенчмарк",
+            in_stock=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def encode_pydantic(rows) -> bytes:
+    products = [ProductResponse.model_validate(row) for row in rows]
+    return encode_json({"products": products}, serializer=pydantic_serializer)
+
+
+def encode_msgspec(rows) -> bytes:
+    return encode_json({"products": to_structs(rows, ProductRow)})
+
+
+def timed(encode, rows) -> float:
+    """Лучшее время одной страницы в микросекундах"""
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        encode(rows)
+        best = min(best, time.perf_counter() - started)
+    return best * 1_000_000
+
+
+def main():
+    for size in PAGE_SIZES:
+        rows = make_rows(size)
+        assert encode_pydantic(rows) == encode_msgspec(rows)
+        for name, encode in (
+            ("pydantic", encode_pydantic),
+            ("msgspec", encode_msgspec),
+        ):
+            elapsed = timed(encode, rows)
+            print(
+                f"{name:>8}: {size:>4} строк, {elapsed:.0f} мкс на страницу, "
+                f"{elapsed / size:.2f} мкс на строку"
+            )
+
+
+if __name__ == "__main__":
+    main()
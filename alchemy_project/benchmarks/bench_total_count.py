@@ -0,0 +1,83 @@
+"""Память и время get_total_count: COUNT(*) в базе против загрузки строк в ORM
+
+Запуск из каталога alchemy_project:
+    python benchmarks/bench_total_count.py
+"""
+
+import asyncio
+import tracemalloc
+from datetime import datetime
+from uuid import uuid4
+
+from common import bench_session_factory, timed
+from sqlalchemy import insert, select
+from tables import User
+from user_repository import UserRepository
+
+TABLE_SIZES = (1_000, 10_000, 100_000)
+
+
+async def legacy_total_count(session) -> int:
+    """Старая реализация: все строки выбираются и считаются в Python"""
+    result = await session.execute(select(User))
+    return len(result.scalars().all())
+
+
+async def peak_memory_kib(coro_factory) -> float:
+    tracemalloc.start()
+    try:
+        await coro_factory()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+async def seed_users(session, total: int) -> None:
+    now = datetime.now()
+    rows = [
+        {
+            "id": uuid4(),
+            "username": f"user_{i}",
+            "email": f"user_{i}@example.com",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(total)
+    ]
+    await session.execute(insert(User), rows)
+    await session.commit()
+
+
+async def main() -> None:
+    print(
+        f"{'rows':>8} | {'legacy KiB':>11} | {'count KiB':>9} "
+        f"| {'legacy ms':>9} | {'count ms':>8}"
+    )
+    async with bench_session_factory() as session_factory:
+        seeded = 0
+        for size in TABLE_SIZES:
+            async with session_factory() as session:
+                await seed_users(session, size - seeded)
+                seeded = size
+                repository = UserRepository(session)
+
+                async def legacy():
+                    session.expunge_all()
+                    return await legacy_total_count(session)
+
+                assert await legacy() == await repository.get_total_count() == size
+
+                legacy_kib = await peak_memory_kib(legacy)
+                count_kib = await peak_memory_kib(repository.get_total_count)
+                legacy_ms = await timed(legacy, repeat=3)
+                count_ms = await timed(repository.get_total_count, repeat=3)
+
+            print(
+                f"{size:>8} | {legacy_kib:>11.0f} | {count_kib:>9.0f} "
+                f"| {legacy_ms:>9.1f} | {count_ms:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from tables import Base
+
+# По умолчанию бенчмарки идут на sqlite в памяти, для реальных цифр
+# нужно указать BENCH_DATABASE_URL на отдельную (пустую) базу Postgres
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+
+@asynccontextmanager
+async def bench_session_factory():
+    """Создает схему в тестовой базе и отдает фабрику сессий"""
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def timed(coro_factory, repeat: int = 5) -> float:
+    """Лучшее время выполнения корутины в миллисекундах"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
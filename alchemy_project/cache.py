@@ -0,0 +1,590 @@
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from pydantic import BaseModel
+from redis_client import breaker, get_redis_client, redis_call, report_redis_error
+from unit_of_work import current_unit_of_work
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Общий префикс ключей, чтобы несколько окружений могли делить один Redis
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "")
+
+# Локальный (L1) кэш воркера: небольшой TTL ограничивает устаревание,
+# если сообщение об инвалидации из другого воркера не дошло
+CACHE_LOCAL_MAXSIZE = int(os.getenv("CACHE_LOCAL_MAXSIZE", 10_000))
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", 30))
+CACHE_INVALIDATION_CHANNEL = f"{CACHE_KEY_PREFIX}cache:invalidate"
+
+# Защита от одновременной перестройки ключа несколькими воркерами:
+#   "" - только объединение запросов внутри воркера (single-flight)
+#   "lock" - перестраивает тот, кто взял SET NX блокировку в Redis
+#   "early" - вероятностное обновление до истечения TTL (XFetch)
+CACHE_STAMPEDE_MODE = os.getenv("CACHE_STAMPEDE_MODE", "")
+CACHE_LOCK_TTL_MS = int(os.getenv("CACHE_LOCK_TTL_MS", 5000))
+CACHE_LOCK_WAIT = float(os.getenv("CACHE_LOCK_WAIT", 1.0))
+CACHE_LOCK_POLL = 0.02
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", 1.0))
+
+CACHES: dict[str, "EntityCache"] = {}
+
+# Другие каналы pub/sub, которые слушает воркер:
+# канал -> (обработчик сообщения, вызов после (пере)подписки)
+CHANNEL_HANDLERS: dict[str, tuple[Callable[[str], None], Callable[[], None]]] = {}
+
+
+def cache_ttl(namespace: str, default: int) -> int:
+    """TTL кэша из переменной окружения CACHE_TTL_<NAMESPACE>"""
+    return int(os.getenv(f"CACHE_TTL_{namespace.upper()}", default))
+
+
+class LocalCache:
+    """LRU-кэш с TTL в памяти процесса"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def schema_version(schema: type[BaseModel]) -> str:
+    """Короткий хэш JSON Schema модели для ключей кэша.
+
+    После изменения схемы ответа новый код читает и пишет другие ключи,
+    поэтому готовый JSON в кэше всегда соответствует текущей схеме, а
+    старые записи просто истекают по TTL
+    """
+    payload = json.dumps(schema.model_json_schema(), sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:8]
+
+
+class _LocalEntry:
+    """Значение в L1: готовый JSON и модель, разобранная при первом запросе"""
+
+    __slots__ = ("raw", "model")
+
+    def __init__(self, raw: bytes, model: Optional[BaseModel] = None):
+        self.raw = raw
+        self.model = model
+
+
+class EntityCache:
+    """Read-through кэш сущностей по id.
+
+    Два уровня: L1 - в памяти воркера, L2 - JSON в Redis. Оба хранят
+    готовый JSON, так что попадание можно отдать клиенту без разбора и
+    повторного кодирования (get_or_load_json). Инвалидация удаляет ключ
+    из Redis и рассылает его остальным воркерам через pub/sub, чтобы
+    они сбросили свой L1
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        schema: type[ModelT],
+        ttl: int,
+        stampede_mode: str = CACHE_STAMPEDE_MODE,
+    ):
+        self.namespace = namespace
+        self.schema = schema
+        self.ttl = ttl
+        self.stampede_mode = stampede_mode
+        self.version = schema_version(schema)
+        self.local = LocalCache(CACHE_LOCAL_MAXSIZE, min(ttl, CACHE_LOCAL_TTL))
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Скользящее среднее времени загрузки, нужно для XFetch
+        self.load_time = 0.0
+        self.local_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.early_refreshes = 0
+        CACHES[namespace] = self
+
+    def key(self, entity_id) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.namespace}:{self.version}:{entity_id}"
+
+    async def get(self, entity_id) -> Optional[ModelT]:
+        entry = await self._get_entry(entity_id)
+        return None if entry is None else self._model(entry)
+
+    async def get_json(self, entity_id) -> Optional[bytes]:
+        """Закэшированный JSON сущности без разбора в модель"""
+        entry = await self._get_entry(entity_id)
+        return None if entry is None else entry.raw
+
+    async def _get_entry(self, entity_id) -> Optional[_LocalEntry]:
+        key = self.key(entity_id)
+        entry = self.local.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            return entry
+
+        cached = await redis_call(lambda client: self._get_remote(client, key))
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._remember(key, cached)
+
+    def _remember(self, key: str, cached: bytes) -> _LocalEntry:
+        """Кладет JSON из Redis в L1"""
+        entry = _LocalEntry(cached)
+        self.local.set(key, entry)
+        return entry
+
+    def _model(self, entry: _LocalEntry) -> ModelT:
+        if entry.model is None:
+            entry.model = self.schema.model_validate_json(entry.raw)
+        return entry.model
+
+    @staticmethod
+    def _dump(value: ModelT) -> bytes:
+        return value.model_dump_json().encode()
+
+    async def _get_remote(self, redis_client, key: str) -> Optional[bytes]:
+        if self.stampede_mode != "early":
+            return await redis_client.get(key)
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            cached, pttl = await pipe.get(key).pttl(key).execute()
+        if cached is not None and self._expires_early(pttl):
+            self.early_refreshes += 1
+            return None
+        return cached
+
+    def _expires_early(self, pttl: int) -> bool:
+        """XFetch: чем ближе истечение TTL и дольше загрузка, тем вероятнее
+        досрочное обновление. Так ключ обычно перестраивает один запрос
+        еще до того, как он пропадет для всех"""
+        if pttl < 0:
+            return False
+        gap = -self.load_time * CACHE_XFETCH_BETA * math.log(1.0 - random.random())
+        return gap * 1000 >= pttl
+
+    async def get_many(self, ids: list) -> dict[Any, ModelT]:
+        """Найденные в кэше значения по id: L1, затем один MGET в Redis"""
+        found = {}
+        remote_ids = []
+        for entity_id in ids:
+            entry = self.local.get(self.key(entity_id))
+            if entry is None:
+                remote_ids.append(entity_id)
+            else:
+                self.local_hits += 1
+                found[entity_id] = self._model(entry)
+        if not remote_ids:
+            return found
+
+        keys = [self.key(entity_id) for entity_id in remote_ids]
+        # Без Redis все оставшиеся id считаются промахами
+        cached = await redis_call(lambda client: client.mget(keys))
+        for entity_id, key, raw in zip(remote_ids, keys, cached or [None] * len(keys)):
+            if raw is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            found[entity_id] = self._model(self._remember(key, raw))
+        return found
+
+    async def set(self, entity_id, value: ModelT) -> bytes:
+        """Записывает значение в L1 и Redis, возвращает записанный JSON"""
+        key = self.key(entity_id)
+        raw = self._dump(value)
+        self.local.set(key, _LocalEntry(raw, value))
+        await redis_call(lambda client: client.setex(key, self.ttl, raw))
+        return raw
+
+    async def set_many(self, values: dict[Any, ModelT]) -> None:
+        """Записывает несколько значений одним pipeline"""
+        if not values:
+            return
+        entries = {
+            self.key(entity_id): _LocalEntry(self._dump(value), value)
+            for entity_id, value in values.items()
+        }
+        for key, entry in entries.items():
+            self.local.set(key, entry)
+        await redis_call(lambda client: self._set_remote_many(client, entries))
+
+    async def _set_remote_many(
+        self, redis_client, entries: dict[str, _LocalEntry]
+    ) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, entry in entries.items():
+                pipe.setex(key, self.ttl, entry.raw)
+            await pipe.execute()
+
+    async def invalidate(self, entity_id) -> None:
+        key = self.key(entity_id)
+        self.local.pop(key)
+        # Если Redis недоступен, старое значение в нем доживет до TTL,
+        # а L1 других воркеров - до CACHE_LOCAL_TTL
+        await redis_call(lambda client: self._delete_remote(client, key))
+
+    async def _delete_remote(self, redis_client, key: str) -> None:
+        await redis_client.delete(key)
+        await redis_client.publish(CACHE_INVALIDATION_CHANNEL, key)
+
+    async def invalidate_many(self, ids: Iterable) -> None:
+        """Сбрасывает несколько ключей одним pipeline"""
+        keys = [self.key(entity_id) for entity_id in ids]
+        if not keys:
+            return
+        for key in keys:
+            self.local.pop(key)
+        await redis_call(lambda client: self._delete_remote_many(client, keys))
+
+    async def _delete_remote_many(self, redis_client, keys: list[str]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            for key in keys:
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, key)
+            await pipe.execute()
+
+    async def get_or_load(
+        self, entity_id, loader: Callable[[], Awaitable[Optional[ModelT]]]
+    ) -> Optional[ModelT]:
+        """Значение из кэша, а при промахе - из loader с записью в кэш.
+
+        Одновременные промахи по одному ключу внутри воркера ждут одну
+        общую перестройку, а не идут в базу каждый сам по себе
+        """
+        cached = await self.get(entity_id)
+        if cached is not None:
+            return cached
+        entry = await self._load_shared(entity_id, loader)
+        return None if entry is None else self._model(entry)
+
+    async def get_or_load_json(
+        self, entity_id, loader: Callable[[], Awaitable[Optional[ModelT]]]
+    ) -> Optional[bytes]:
+        """Как get_or_load, но возвращает JSON для ответа.
+
+        При попадании байты из L1 или Redis отдаются как есть, без
+        model_validate и повторного кодирования. При промахе - тот же JSON,
+        что записан в кэш
+        """
+        raw = await self.get_json(entity_id)
+        if raw is not None:
+            return raw
+        entry = await self._load_shared(entity_id, loader)
+        return None if entry is None else entry.raw
+
+    async def _load_shared(self, entity_id, loader) -> Optional[_LocalEntry]:
+        """Загрузка при промахе, общая для одновременных запросов ключа"""
+        key = self.key(entity_id)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._rebuild(entity_id, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # shield: отмена одного ожидающего запроса не отменяет перестройку
+        return await asyncio.shield(task)
+
+    async def get_many_or_load(
+        self, ids: list, loader: Callable[[list], Awaitable[dict[Any, ModelT]]]
+    ) -> list[ModelT]:
+        """Значения по списку id в порядке запроса, без повторов.
+
+        Попадания берутся одним MGET, промахи загружает один вызов
+        loader(missing_ids) и они записываются в кэш одним pipeline.
+        Не найденные id в результат не попадают
+        """
+        ids = list(dict.fromkeys(ids))
+        found = await self.get_many(ids)
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing:
+            loaded = await loader(missing)
+            self.loads += 1
+            await self.set_many(loaded)
+            found.update(loaded)
+        return [found[entity_id] for entity_id in ids if entity_id in found]
+
+    async def _rebuild(self, entity_id, loader) -> Optional[_LocalEntry]:
+        if self.stampede_mode == "lock":
+            return await self._load_with_lock(entity_id, loader)
+        return await self._load(entity_id, loader)
+
+    async def _load(self, entity_id, loader) -> Optional[_LocalEntry]:
+        started = time.perf_counter()
+        value = await loader()
+        elapsed = time.perf_counter() - started
+        self.load_time = (
+            elapsed if not self.loads else 0.8 * self.load_time + 0.2 * elapsed
+        )
+        self.loads += 1
+
+        if value is None:
+            return None
+        return _LocalEntry(await self.set(entity_id, value), value)
+
+    async def _load_with_lock(self, entity_id, loader) -> Optional[_LocalEntry]:
+        key = self.key(entity_id)
+        lock_key = f"{key}:lock"
+        # Без Redis блокировку взять негде - загружаем сами
+        acquired = await redis_call(
+            lambda client: client.set(lock_key, "1", nx=True, px=CACHE_LOCK_TTL_MS),
+            default=True,
+        )
+        if acquired:
+            try:
+                return await self._load(entity_id, loader)
+            finally:
+                await redis_call(lambda client: client.delete(lock_key))
+
+        # Значение уже перестраивает другой воркер - ждем его в Redis
+        deadline = time.monotonic() + CACHE_LOCK_WAIT
+        while time.monotonic() < deadline and not breaker.is_open:
+            await asyncio.sleep(CACHE_LOCK_POLL)
+            cached = await redis_call(lambda client: client.get(key))
+            if cached is not None:
+                self.hits += 1
+                return self._remember(key, cached)
+
+        return await self._load(entity_id, loader)
+
+    def stats(self) -> dict:
+        return {
+            "local_hits": self.local_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "early_refreshes": self.early_refreshes,
+            "local_size": len(self.local),
+        }
+
+
+class CountCache:
+    """Точное число строк таблицы без фильтров в Redis.
+
+    Сбрасывается при вставке и удалении (invalidates_count), так что
+    списки без фильтров не выполняют COUNT(*) на каждый запрос. TTL
+    ограничивает ошибку, если подсчет обогнал параллельную запись
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self) -> str:
+        return f"{CACHE_KEY_PREFIX}count:{self.namespace}"
+
+    async def get_or_load(self, loader: Callable[[], Awaitable[int]]) -> int:
+        key = self.key()
+        cached = await redis_call(lambda client: client.get(key))
+        if cached is not None:
+            return int(cached)
+
+        value = await loader()
+        await redis_call(lambda client: client.setex(key, self.ttl, value))
+        return value
+
+    async def invalidate(self) -> None:
+        key = self.key()
+        await redis_call(lambda client: client.delete(key))
+
+
+class FilterCache:
+    """Готовый JSON агрегатов в Redis по сигнатуре фильтров.
+
+    Ключ - хэш отсортированных фильтров, поэтому одинаковые фильтры в любом
+    порядке попадают в одну запись. Сигнатур много, и сбрасывать их при
+    каждой записи дорого: значение живет ttl секунд, и это предел его
+    устаревания
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self, filters: dict) -> str:
+        payload = json.dumps(filters, sort_keys=True, default=str)
+        signature = hashlib.sha1(payload.encode()).hexdigest()
+        return f"{CACHE_KEY_PREFIX}{self.namespace}:{signature}"
+
+    async def get_or_load(
+        self, filters: dict, loader: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        key = self.key(filters)
+        cached = await redis_call(lambda client: client.get(key))
+        if cached is not None:
+            return cached
+
+        value = await loader()
+        await redis_call(lambda client: client.setex(key, self.ttl, value))
+        return value
+
+
+def cache_stats() -> dict:
+    """Счетчики попаданий и промахов по всем кэшам"""
+    return {namespace: cache.stats() for namespace, cache in CACHES.items()}
+
+
+def evict_local(key: str) -> None:
+    """Удаляет ключ из L1 всех кэшей воркера"""
+    for cache in CACHES.values():
+        cache.local.pop(key)
+
+
+def subscribe_channel(
+    channel: str, on_message: Callable[[str], None], on_subscribe: Callable[[], None]
+) -> None:
+    """Добавляет канал в подписку listen_invalidations.
+
+    on_subscribe вызывается после каждой (пере)подписки: сообщения,
+    пришедшие без подписки, потеряны, и состояние нужно восстановить
+    """
+    CHANNEL_HANDLERS[channel] = (on_message, on_subscribe)
+
+
+async def listen_invalidations(retry_delay: float = 5.0) -> None:
+    """Слушает канал инвалидации и сбрасывает L1 при изменениях в других воркерах.
+
+    Заодно доставляет сообщения каналов, добавленных через subscribe_channel
+    """
+    while True:
+        redis_client = await get_redis_client()
+        if redis_client is None:
+            await asyncio.sleep(retry_delay)
+            continue
+
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL, *CHANNEL_HANDLERS)
+                # Пока подписки не было, сообщения могли потеряться
+                for cache in CACHES.values():
+                    cache.local.clear()
+                for _, on_subscribe in CHANNEL_HANDLERS.values():
+                    on_subscribe()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    # Клиент без decode_responses: канал и данные - байты
+                    data = message["data"].decode()
+                    handlers = CHANNEL_HANDLERS.get(message["channel"].decode())
+                    if handlers is None:
+                        evict_local(data)
+                    else:
+                        handlers[0](data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Подписка на инвалидацию кэша прервана: {e}")
+            report_redis_error(e)
+            await asyncio.sleep(retry_delay)
+
+
+def cached(cache: EntityCache):
+    """Кэширует метод сервиса get_by_id(entity_id).
+
+    Вызовы с дополнительными аргументами идут мимо кэша, так как их
+    результат может отличаться от полного представления сущности
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, entity_id, *args, **kwargs):
+            if args or kwargs:
+                return await method(self, entity_id, *args, **kwargs)
+            return await cache.get_or_load(entity_id, lambda: method(self, entity_id))
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_committed(cache: EntityCache, ids: Iterable) -> None:
+    """Сбрасывает ключи сейчас, а внутри UnitOfWork - еще раз после commit.
+
+    До фиксации другой запрос мог снова положить в кэш старое значение
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    await cache.invalidate_many(ids)
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is not None:
+        unit_of_work.on_commit(lambda: cache.invalidate_many(ids))
+
+
+def invalidates(cache: EntityCache):
+    """Сбрасывает кэш сущности после успешного update/delete(entity_id, ...).
+
+    Внутри UnitOfWork ключ сбрасывается еще раз после commit: до фиксации
+    другой запрос мог снова положить в кэш старое значение
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, entity_id, *args, **kwargs):
+            result = await method(self, entity_id, *args, **kwargs)
+            await cache.invalidate(entity_id)
+            unit_of_work = current_unit_of_work.get()
+            if unit_of_work is not None:
+                unit_of_work.on_commit(lambda: cache.invalidate(entity_id))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates_count(cache: CountCache):
+    """Сбрасывает кэш количества после метода, добавляющего или удаляющего строки"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            result = await method(*args, **kwargs)
+            await cache.invalidate()
+            unit_of_work = current_unit_of_work.get()
+            if unit_of_work is not None:
+                unit_of_work.on_commit(cache.invalidate)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,107 @@
+"""Структуры msgspec для ответов списков.
+
+Строка ORM превращается в Struct один раз (msgspec.convert), а Litestar
+кодирует Struct в JSON напрямую, без model_validate и без повторной
+сериализации pydantic-модели. Поля и их порядок совпадают со схемами
+*Response из schemas.py, поэтому ответ не меняется ни на байт. Схемы
+pydantic остаются для входных данных и кэша по id
+"""
+
+from datetime import datetime
+from typing import Any, Iterable, Optional, TypeVar
+from uuid import UUID
+
+import msgspec
+
+StructT = TypeVar("StructT", bound=msgspec.Struct)
+
+
+class UserRow(msgspec.Struct, kw_only=True):
+    username: str
+    email: str
+    description: Optional[str] = None
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class AddressRow(msgspec.Struct, kw_only=True):
+    street: str
+    city: str
+    state: str
+    zip_code: str
+    country: str
+    is_primary: bool = False
+    id: UUID
+    user_id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class ProductRow(msgspec.Struct, kw_only=True):
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: str
+    in_stock: bool = True
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+
+class OrderItemRow(msgspec.Struct, kw_only=True):
+    product_id: UUID
+    quantity: int
+    unit_price: float
+    id: UUID
+    order_id: UUID
+    created_at: datetime
+    # Заполняется только при include=product
+    product: Optional[ProductRow] = None
+
+
+class OrderRow(msgspec.Struct, kw_only=True):
+    user_id: UUID
+    delivery_address_id: UUID
+    status: str = "pending"
+    id: UUID
+    total_amount: float
+    created_at: datetime
+    updated_at: datetime
+    items: list[OrderItemRow] = []
+    address: Optional[AddressRow] = None
+
+
+class ProductSuggestion(msgspec.Struct):
+    id: UUID
+    name: str
+
+
+class CategoryFacet(msgspec.Struct):
+    category: str
+    count: int
+
+
+class PriceBucketFacet(msgspec.Struct):
+    price_min: float
+    price_max: Optional[float]
+    count: int
+
+
+class ProductFacets(msgspec.Struct):
+    total: int
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucketFacet]
+    filters: dict
+
+
+class UsersPage(msgspec.Struct):
+    users: list[UserRow]
+    total_count: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+def to_structs(rows: Iterable[Any], struct: type[StructT]) -> list[StructT]:
+    """Строки ORM в список Struct одним вызовом msgspec"""
+    return msgspec.convert(list(rows), list[struct], from_attributes=True)
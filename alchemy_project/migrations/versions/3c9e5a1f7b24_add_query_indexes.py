@@ -0,0 +1,67 @@
+"""Add indexes for foreign keys and repository queries
+
+Revision ID: 3c9e5a1f7b24
+Revises: eafd4b27d482
+Create Date: 2026-10-17 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5a1f7b24'
+down_revision: Union[str, Sequence[str], None] = 'eafd4b27d482'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя индекса, таблица, колонки) - совпадает с Index(...) в tables.py
+INDEXES = [
+    ('ix_users_created_at_id', 'users', ['created_at DESC', 'id DESC']),
+    ('ix_addresses_user_id_created_at', 'addresses',
+     ['user_id', 'created_at DESC', 'id DESC']),
+    ('ix_addresses_created_at_id', 'addresses', ['created_at DESC', 'id DESC']),
+    ('ix_products_category_created_at', 'products',
+     ['category', 'created_at DESC', 'id DESC']),
+    ('ix_products_created_at_id', 'products', ['created_at DESC', 'id DESC']),
+    ('ix_orders_user_id_created_at', 'orders',
+     ['user_id', 'created_at DESC', 'id DESC']),
+    ('ix_orders_status_created_at', 'orders',
+     ['status', 'created_at DESC', 'id DESC']),
+    ('ix_orders_created_at_id', 'orders', ['created_at DESC', 'id DESC']),
+    ('ix_orders_delivery_address_id', 'orders', ['delivery_address_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_product_id', 'order_items', ['product_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # поэтому каждый индекс строится в autocommit без блокировки записи.
+    # Если построение прервалось, остается INVALID индекс - его нужно
+    # удалить вручную и повторить миграцию
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(column) for column in columns],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
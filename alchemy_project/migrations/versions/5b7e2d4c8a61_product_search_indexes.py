@@ -0,0 +1,59 @@
+"""Add full-text and trigram indexes for product search
+
+Revision ID: 5b7e2d4c8a61
+Revises: 8d2f6b3a9c15
+Create Date: 2026-10-17 16:20:11.573902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2d4c8a61'
+down_revision: Union[str, Sequence[str], None] = '8d2f6b3a9c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Совпадает с product_search_vector() в tables.py
+SEARCH_VECTOR = (
+    "(setweight(to_tsvector('russian', name), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_products_search_vector',
+            'products',
+            [sa.text(SEARCH_VECTOR)],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_products_name_trgm',
+            'products',
+            [sa.text('name gin_trgm_ops')],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in ('ix_products_name_trgm', 'ix_products_search_vector'):
+            op.drop_index(
+                name,
+                table_name='products',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
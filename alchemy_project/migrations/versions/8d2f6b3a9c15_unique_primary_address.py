@@ -0,0 +1,57 @@
+"""Allow at most one primary address per user
+
+Revision ID: 8d2f6b3a9c15
+Revises: 3c9e5a1f7b24
+Create Date: 2026-10-17 14:05:47.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f6b3a9c15'
+down_revision: Union[str, Sequence[str], None] = '3c9e5a1f7b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Старый код переключал основной адрес в двух транзакциях, поэтому
+    # у части пользователей их может быть несколько - оставляем последний
+    op.execute(
+        """
+        UPDATE addresses SET is_primary = false
+        WHERE is_primary AND id NOT IN (
+            SELECT DISTINCT ON (user_id) id FROM addresses
+            WHERE is_primary
+            ORDER BY user_id, updated_at DESC, id DESC
+        )
+        """
+    )
+    # Если за время построения появится новый дубль, индекс останется
+    # INVALID - его нужно удалить и повторить миграцию
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_addresses_user_id_primary',
+            'addresses',
+            ['user_id'],
+            unique=True,
+            postgresql_where=sa.text('is_primary'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_addresses_user_id_primary',
+            table_name='addresses',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -1,11 +1,58 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from litestar import Controller, delete, get, post, put
+from litestar.exceptions import ValidationException
 from litestar.params import Body, Parameter
+from litestar.response import Stream
+from order_repository import ORDER_RELATIONS, OrderRepository
 from order_service import OrderService
+from pagination import CountMode, fetch_page, next_cursor
 from schemas import OrderCreate, OrderResponse, OrderUpdate
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def order_filters(
+    user_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> dict:
+    """Фильтры OrderRepository из query-параметров, пустые отбрасываются"""
+    filters = {}
+    if user_id:
+        filters["user_id"] = user_id
+    if status:
+        filters["status"] = status
+    if min_amount is not None:
+        filters["min_amount"] = min_amount
+    if max_amount is not None:
+        filters["max_amount"] = max_amount
+    if created_after:
+        filters["created_after"] = created_after
+    if created_before:
+        filters["created_before"] = created_before
+    return filters
+
+
+def parse_include(include: Optional[str]) -> set[str]:
+    """Связи из include=items,product,address"""
+    relations = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = relations - set(ORDER_RELATIONS)
+    if unknown:
+        raise ValidationException(
+            detail=f"Unknown include: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(ORDER_RELATIONS)}"
+        )
+    return relations
 
 
 class OrderController(Controller):
@@ -17,7 +64,7 @@ class OrderController(Controller):
         self, order_service: OrderService, order_id: UUID
     ) -> OrderResponse:
         """Get order by ID with all details"""
-        return await order_service.get_by_id(order_id, include_relations=True)
+        return await order_service.get_by_id(order_id)
 
     @get("/get_user_orders/{user_id:uuid}")
     async def get_orders_by_user_id(
@@ -26,9 +73,13 @@ class OrderController(Controller):
         user_id: UUID,
         count: int = Parameter(gt=0, le=100, default=10),
         page: int = Parameter(gt=0, default=1),
+        cursor: Optional[str] = Parameter(default=None),
+        include: Optional[str] = Parameter(default="items"),
     ) -> dict:
         """Get all orders for a specific user"""
-        orders = await order_service.get_by_user_id(user_id, count, page)
+        orders = await order_service.get_by_user_id(
+            user_id, count, page, cursor, include=parse_include(include)
+        )
         total_count = await order_service.get_total_count(user_id=user_id)
 
         return {
@@ -37,6 +88,7 @@ class OrderController(Controller):
             "user_id": user_id,
             "page": page,
             "count": count,
+            "next_cursor": next_cursor(orders, count),
         }
 
     @get("/get_all_orders")
@@ -45,39 +97,82 @@ class OrderController(Controller):
         order_service: OrderService,
         count: int = Parameter(gt=0, le=100, default=10),
         page: int = Parameter(gt=0, default=1),
+        cursor: Optional[str] = Parameter(default=None),
         user_id: Optional[UUID] = Parameter(default=None),
         status: Optional[str] = Parameter(default=None),
         min_amount: Optional[float] = Parameter(default=None, ge=0),
         max_amount: Optional[float] = Parameter(default=None, ge=0),
         created_after: Optional[datetime] = Parameter(default=None),
         created_before: Optional[datetime] = Parameter(default=None),
+        include: Optional[str] = Parameter(
+            default="items",
+            description="Relations to load: items, product, address",
+        ),
+        with_total: bool = Parameter(default=True),
+        count_mode: CountMode = Parameter(default="separate"),
     ) -> dict:
         """Get all orders with pagination and filtering"""
-        filters = {}
-        if user_id:
-            filters["user_id"] = user_id
-        if status:
-            filters["status"] = status
-        if min_amount is not None:
-            filters["min_amount"] = min_amount
-        if max_amount is not None:
-            filters["max_amount"] = max_amount
-        if created_after:
-            filters["created_after"] = created_after
-        if created_before:
-            filters["created_before"] = created_before
-
-        orders = await order_service.get_by_filter(count=count, page=page, **filters)
-        total_count = await order_service.get_total_count(**filters)
+        filters = order_filters(
+            user_id, status, min_amount, max_amount, created_after, created_before
+        )
+
+        orders, total_count, total_is_estimate = await fetch_page(
+            order_service,
+            count,
+            page,
+            cursor,
+            with_total,
+            count_mode,
+            filters,
+            include=parse_include(include),
+        )
 
         return {
             "orders": orders,
             "total_count": total_count,
+            "total_is_estimate": total_is_estimate,
             "page": page,
             "count": count,
+            "next_cursor": next_cursor(orders, count),
             "filters": filters,
         }
 
+    @get("/export")
+    async def export_orders(
+        self,
+        session_factory: async_sessionmaker,
+        export_format: Literal["ndjson", "csv"] = Parameter(
+            query="format", default="ndjson"
+        ),
+        user_id: Optional[UUID] = Parameter(default=None),
+        status: Optional[str] = Parameter(default=None),
+        min_amount: Optional[float] = Parameter(default=None, ge=0),
+        max_amount: Optional[float] = Parameter(default=None, ge=0),
+        created_after: Optional[datetime] = Parameter(default=None),
+        created_before: Optional[datetime] = Parameter(default=None),
+    ) -> Stream:
+        """Stream all orders matching the filters as NDJSON or CSV"""
+        filters = order_filters(
+            user_id, status, min_amount, max_amount, created_after, created_before
+        )
+
+        # Сессия запроса закрывается до начала отправки тела ответа,
+        # поэтому выгрузка открывает свою и держит ее до конца потока
+        # (таймаут простоя транзакции снимает stream_by_filter)
+        async def export():
+            async with session_factory() as session:
+                order_service = OrderService(OrderRepository(session))
+                async for chunk in order_service.export(export_format, **filters):
+                    yield chunk
+
+        return Stream(
+            export(),
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="orders.{export_format}"'
+            },
+        )
+
     @post("/create_order")
     async def create_order(
         self,
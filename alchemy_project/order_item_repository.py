@@ -1,16 +1,15 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
+from base_repository import BaseRepository
 from schemas import OrderItemCreate, OrderItemUpdate
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select
 from sqlalchemy.orm import joinedload
 from tables import OrderItem
 
 
-class OrderItemRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+class OrderItemRepository(BaseRepository):
+    model = OrderItem
 
     async def get_by_order_id(self, order_id: UUID) -> List[OrderItem]:
         result = await self.session.execute(
@@ -34,30 +33,25 @@ class OrderItemRepository:
             unit_price=order_item_data.unit_price,
         )
         self.session.add(order_item)
-        await self.session.commit()
+        await self._commit()
         await self.session.refresh(order_item)
         return order_item
 
     async def update(
         self, order_item_id: UUID, order_item_data: OrderItemUpdate
     ) -> OrderItem:
-        order_item = await self.session.get(OrderItem, order_item_id)
-        if not order_item:
-            return None
-
         update_data = order_item_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(order_item, field, value)
-
-        await self.session.commit()
-        await self.session.refresh(order_item)
+        order_item = await self._update_returning(order_item_id, update_data)
+        await self._commit()
         return order_item
 
-    async def delete(self, order_item_id: UUID) -> bool:
-        order_item = await self.session.get(OrderItem, order_item_id)
-        if not order_item:
-            return False
-
-        await self.session.delete(order_item)
-        await self.session.commit()
-        return True
+    async def delete(self, order_item_id: UUID) -> Optional[UUID]:
+        """Удаляет позицию и возвращает id ее заказа, None - если ее не было"""
+        result = await self.session.execute(
+            delete(OrderItem)
+            .where(OrderItem.id == order_item_id)
+            .returning(OrderItem.order_id)
+        )
+        order_id = result.scalar_one_or_none()
+        await self._commit()
+        return order_id
@@ -1,8 +1,10 @@
 from typing import List
 from uuid import UUID
 
+from cache import invalidate_committed
 from litestar.exceptions import NotFoundException
 from order_item_repository import OrderItemRepository
+from order_service import order_cache
 from schemas import OrderItemCreate, OrderItemResponse, OrderItemUpdate
 
 
@@ -23,6 +25,8 @@ class OrderItemService:
     async def create(self, order_item_data: OrderItemCreate) -> OrderItemResponse:
         """Создать товар в заказе"""
         order_item = await self.repository.create(order_item_data)
+        # Позиции встроены в закэшированный заказ
+        await invalidate_committed(order_cache, [order_item.order_id])
         return OrderItemResponse.model_validate(order_item)
 
     async def update(
@@ -34,15 +38,17 @@ class OrderItemService:
             raise NotFoundException(
                 detail=f"Order item with ID {order_item_id} not found"
             )
+        await invalidate_committed(order_cache, [order_item.order_id])
         return OrderItemResponse.model_validate(order_item)
 
     async def delete(self, order_item_id: UUID) -> None:
         """Удалить товар из заказа"""
-        success = await self.repository.delete(order_item_id)
-        if not success:
+        order_id = await self.repository.delete(order_item_id)
+        if order_id is None:
             raise NotFoundException(
                 detail=f"Order item with ID {order_item_id} not found"
             )
+        await invalidate_committed(order_cache, [order_id])
 
     async def update_quantity(
         self, order_item_id: UUID, quantity: int
@@ -1,16 +1,54 @@
-from typing import List, Optional
+import os
+from typing import AsyncIterator, Collection, List, Optional
 from uuid import UUID
 
+from base_repository import BaseRepository
+from litestar.exceptions import ValidationException
 from schemas import OrderCreate, OrderItemCreate, OrderUpdate
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, text
+from sqlalchemy.orm import joinedload, noload, selectinload
 from tables import Order, OrderItem, Product
 
-
-class OrderRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+# Связи, которые можно запросить через include
+ORDER_RELATIONS = ("items", "product", "address")
+
+# Лимит на один FETCH выгрузки вместо короткого statement_timeout API
+EXPORT_STATEMENT_TIMEOUT_MS = int(os.getenv("EXPORT_STATEMENT_TIMEOUT_MS", 60000))
+
+
+class OrderRepository(BaseRepository):
+    model = Order
+
+    def _filter_conditions(self, **kwargs) -> list:
+        conditions = []
+        for key, value in kwargs.items():
+            if key == "created_after":
+                conditions.append(Order.created_at >= value)
+            elif key == "created_before":
+                conditions.append(Order.created_at <= value)
+            elif key == "min_amount":
+                conditions.append(Order.total_amount >= value)
+            elif key == "max_amount":
+                conditions.append(Order.total_amount <= value)
+            elif key in Order.__table__.columns:
+                conditions.append(getattr(Order, key) == value)
+        return conditions
+
+    def _load_options(self, include: Collection[str]) -> list:
+        """selectinload для запрошенных связей: по одному запросу на связь
+        для всей страницы, а не на каждый заказ"""
+        options = []
+        if "items" in include or "product" in include:
+            items = selectinload(Order.order_items)
+            if "product" in include:
+                items = items.selectinload(OrderItem.product)
+            else:
+                # Ответ читает item.product: без noload это ленивая загрузка
+                items = items.noload(OrderItem.product)
+            options.append(items)
+        if "address" in include:
+            options.append(selectinload(Order.delivery_address))
+        return options
 
     async def get_by_id(
         self, order_id: UUID, include_relations: bool = False
@@ -18,136 +56,121 @@ class OrderRepository:
         query = select(Order).where(Order.id == order_id)
 
         if include_relations:
+            # joinedload коллекции размножает строку заказа, поэтому
+            # позиции грузятся отдельным selectin-запросом
             query = query.options(
-                joinedload(Order.user),
-                joinedload(Order.delivery_address),
-                joinedload(Order.order_items).joinedload(OrderItem.product),
+                joinedload(Order.user), *self._load_options(ORDER_RELATIONS)
             )
 
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
     async def get_by_user_id(
-        self, user_id: UUID, count: int = 10, page: int = 1
+        self,
+        user_id: UUID,
+        count: int = 10,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        include: Collection[str] = (),
     ) -> List[Order]:
-        offset = (page - 1) * count
-        result = await self.session.execute(
-            select(Order)
-            .where(Order.user_id == user_id)
-            .order_by(Order.created_at.desc())
-            .offset(offset)
-            .limit(count)
-        )
+        query = select(Order).where(Order.user_id == user_id)
+        query = self._paginate(query, count, page, cursor)
+        query = query.options(*self._load_options(include))
+        result = await self.session.execute(query)
         return list(result.scalars().all())
 
     async def get_by_filter(
-        self, count: int = 10, page: int = 1, **kwargs
+        self,
+        count: int = 10,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        include: Collection[str] = (),
+        **kwargs,
     ) -> List[Order]:
-        offset = (page - 1) * count
-        query = select(Order)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Order, key):
-                    if key == "created_after":
-                        query = query.where(Order.created_at >= value)
-                    elif key == "created_before":
-                        query = query.where(Order.created_at <= value)
-                    elif key == "min_amount":
-                        query = query.where(Order.total_amount >= value)
-                    elif key == "max_amount":
-                        query = query.where(Order.total_amount <= value)
-                    else:
-                        query = query.where(getattr(Order, key) == value)
-
-        query = query.order_by(Order.created_at.desc()).offset(offset).limit(count)
+        query = self._apply_filters(select(Order), **kwargs)
+        query = self._paginate(query, count, page, cursor)
+        query = query.options(*self._load_options(include))
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def get_total_count(self, **kwargs) -> int:
-        query = select(Order)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Order, key):
-                    if key == "created_after":
-                        query = query.where(Order.created_at >= value)
-                    elif key == "created_before":
-                        query = query.where(Order.created_at <= value)
-                    elif key == "min_amount":
-                        query = query.where(Order.total_amount >= value)
-                    elif key == "max_amount":
-                        query = query.where(Order.total_amount <= value)
-                    else:
-                        query = query.where(getattr(Order, key) == value)
-
-        result = await self.session.execute(query)
-        return len(result.scalars().all())
+    async def stream_by_filter(
+        self, batch_size: int = 1000, **kwargs
+    ) -> AsyncIterator[List[Order]]:
+        """Все заказы по фильтрам пачками через серверный курсор.
+
+        Транзакция курсора открыта, пока клиент читает ответ, и медленный
+        клиент простаивает между пачками дольше
+        idle_in_transaction_session_timeout профиля api. Поэтому в Postgres
+        для этой транзакции таймаут простоя снимается через SET LOCAL, а
+        statement_timeout поднимается до EXPORT_STATEMENT_TIMEOUT_MS. SET
+        LOCAL действует до конца транзакции и работает и за PgBouncer
+        """
+        if self.session.bind.dialect.name == "postgresql":
+            await self.session.execute(
+                text("SET LOCAL idle_in_transaction_session_timeout = 0")
+            )
+            await self.session.execute(
+                text(f"SET LOCAL statement_timeout = {EXPORT_STATEMENT_TIMEOUT_MS:d}")
+            )
+        query = self._apply_filters(select(Order), **kwargs)
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        result = await self.session.stream_scalars(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+            # Уже выгруженные заказы не держим в identity map сессии
+            for order in partition:
+                self.session.expunge(order)
 
     async def create(self, order_data: OrderCreate) -> Order:
-        # Создаем заказ
-        order = Order(
-            user_id=order_data.user_id,
-            delivery_address_id=order_data.delivery_address_id,
-            status=order_data.status,
-            total_amount=0.0,  # Рассчитаем ниже
+        # Цены всех товаров заказа получаем одним запросом WHERE id IN (...)
+        product_ids = {item.product_id for item in order_data.items}
+        result = await self.session.execute(
+            select(Product.id, Product.price).where(Product.id.in_(product_ids))
         )
-        self.session.add(order)
-        await self.session.flush()  # Получаем order.id
-
-        # Добавляем товары в заказ
-        total_amount = 0.0
-        for item_data in order_data.items:
-            # Получаем текущую цену товара
-            product_result = await self.session.execute(
-                select(Product).where(Product.id == item_data.product_id)
-            )
-            product = product_result.scalar_one()
+        prices = dict(result.tuples().all())
+
+        missing_ids = product_ids - prices.keys()
+        if missing_ids:
+            missing = ", ".join(sorted(str(product_id) for product_id in missing_ids))
+            raise ValidationException(detail=f"Products not found: {missing}")
 
-            order_item = OrderItem(
-                order_id=order.id,
+        order_items = [
+            OrderItem(
                 product_id=item_data.product_id,
                 quantity=item_data.quantity,
-                unit_price=product.price,
+                unit_price=prices[item_data.product_id],
             )
-            self.session.add(order_item)
-            total_amount += product.price * item_data.quantity
+            for item_data in order_data.items
+        ]
 
-        # Обновляем общую сумму заказа
-        order.total_amount = total_amount
+        # Создаем заказ вместе с товарами, все строки уходят одним flush
+        order = Order(
+            user_id=order_data.user_id,
+            delivery_address_id=order_data.delivery_address_id,
+            status=order_data.status,
+            total_amount=sum(item.unit_price * item.quantity for item in order_items),
+            order_items=order_items,
+        )
+        self.session.add(order)
 
-        await self.session.commit()
+        await self._commit()
         await self.session.refresh(order)
         return order
 
     async def update(self, order_id: UUID, order_data: OrderUpdate) -> Optional[Order]:
-        order = await self.get_by_id(order_id)
-        if not order:
-            return None
-
         update_data = order_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(order, field, value)
-
-        await self.session.commit()
-        await self.session.refresh(order)
+        order = await self._update_returning(order_id, update_data)
+        await self._commit()
         return order
 
     async def delete(self, order_id: UUID) -> bool:
-        order = await self.get_by_id(order_id)
-        if not order:
-            return False
-
-        await self.session.delete(order)
-        await self.session.commit()
-        return True
+        deleted = await self._delete_returning(order_id)
+        await self._commit()
+        return deleted
 
     async def update_status(self, order_id: UUID, status: str) -> Optional[Order]:
-        order = await self.get_by_id(order_id)
-        if not order:
-            return None
-
-        order.status = status
-        await self.session.commit()
-        await self.session.refresh(order)
+        order = await self._update_returning(order_id, {"status": status})
+        await self._commit()
         return order
@@ -1,15 +1,34 @@
-from typing import List
+import csv
+import io
+from typing import AsyncIterator, Collection, List, Optional
 from uuid import UUID
 
+import msgspec
+from cache import EntityCache, cache_ttl, cached, invalidates
+from dto import OrderRow, to_structs
 from litestar.exceptions import NotFoundException, ValidationException
 from order_repository import OrderRepository
 from schemas import OrderCreate, OrderItemBase, OrderResponse, OrderUpdate
 
 
+EXPORT_FIELDS = [
+    "id",
+    "user_id",
+    "delivery_address_id",
+    "status",
+    "total_amount",
+    "created_at",
+    "updated_at",
+]
+
+order_cache = EntityCache("order", OrderResponse, ttl=cache_ttl("order", 300))
+
+
 class OrderService:
     def __init__(self, repository: OrderRepository):
         self.repository = repository
 
+    @cached(order_cache)
     async def get_by_id(
         self, order_id: UUID, include_relations: bool = True
     ) -> OrderResponse:
@@ -20,28 +39,68 @@ class OrderService:
         return OrderResponse.model_validate(order)
 
     async def get_by_user_id(
-        self, user_id: UUID, count: int = 10, page: int = 1
-    ) -> List[OrderResponse]:
+        self,
+        user_id: UUID,
+        count: int = 10,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        include: Collection[str] = (),
+    ) -> List[OrderRow]:
         """Получить заказы пользователя"""
-        orders = await self.repository.get_by_user_id(user_id, count, page)
-        return [OrderResponse.model_validate(order) for order in orders]
+        orders = await self.repository.get_by_user_id(
+            user_id, count, page, cursor, include
+        )
+        return to_structs(orders, OrderRow)
 
     async def get_by_filter(
         self, count: int = 10, page: int = 1, **kwargs
-    ) -> List[OrderResponse]:
+    ) -> List[OrderRow]:
         """Получить заказы с фильтрацией"""
         orders = await self.repository.get_by_filter(count=count, page=page, **kwargs)
-        return [OrderResponse.model_validate(order) for order in orders]
+        return to_structs(orders, OrderRow)
+
+    async def get_by_filter_with_total(
+        self, count: int = 10, page: int = 1, **kwargs
+    ) -> tuple[List[OrderRow], Optional[int]]:
+        """Получить заказы и их общее количество одним запросом"""
+        orders, total = await self.repository.get_by_filter_with_total(
+            count=count, page=page, **kwargs
+        )
+        return to_structs(orders, OrderRow), total
 
     async def get_total_count(self, **kwargs) -> int:
         """Получить общее количество заказов"""
         return await self.repository.get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs) -> tuple[int, bool]:
+        """Общее количество заказов, всегда точное"""
+        return await self.get_total_count(**kwargs), False
+
+    async def export(self, export_format: str, **kwargs) -> AsyncIterator[str]:
+        """Выгрузить заказы в NDJSON или CSV, по одному куску на пачку строк"""
+        if export_format == "csv":
+            yield ",".join(EXPORT_FIELDS) + "\r\n"
+
+        async for orders in self.repository.stream_by_filter(**kwargs):
+            rows = [
+                {field: getattr(order, field) for field in EXPORT_FIELDS}
+                for order in orders
+            ]
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                # msgspec пишет даты и UUID в ISO 8601, как остальные ответы API
+                lines = (msgspec.json.encode(row) + b"\n" for row in rows)
+                yield b"".join(lines).decode()
+
     async def create(self, order_data: OrderCreate) -> OrderResponse:
         """Создать новый заказ"""
         order = await self.repository.create(order_data)
         return OrderResponse.model_validate(order)
 
+    @invalidates(order_cache)
     async def update(self, order_id: UUID, order_data: OrderUpdate) -> OrderResponse:
         """Обновить заказ"""
         order = await self.repository.update(order_id, order_data)
@@ -49,6 +108,7 @@ class OrderService:
             raise NotFoundException(detail=f"Order with ID {order_id} not found")
         return OrderResponse.model_validate(order)
 
+    @invalidates(order_cache)
     async def delete(self, order_id: UUID) -> None:
         """Удалить заказ"""
         success = await self.repository.delete(order_id)
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, Literal, Optional, Sequence
+from uuid import UUID
+
+from cache import CountCache
+from litestar.exceptions import ValidationException
+
+
+# separate - страница и COUNT(*) отдельными запросами,
+# window - одним запросом с count(*) OVER ()
+CountMode = Literal["separate", "window"]
+
+# С какого размера таблицы списки без фильтров показывают оценку
+# из pg_class.reltuples вместо точного COUNT(*)
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", 100_000))
+
+
+def encode_cursor(created_at: datetime, entity_id: UUID) -> str:
+    """Упаковывает позицию (created_at, id) в непрозрачную строку"""
+    payload = json.dumps([created_at.isoformat(), str(entity_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Распаковывает курсор, созданный encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, entity_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(entity_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise ValidationException(detail=f"Invalid cursor: {cursor}") from e
+
+
+def next_cursor(items: Sequence[Any], count: int) -> Optional[str]:
+    """Курсор следующей страницы или None, если страница последняя"""
+    if len(items) < count:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
+
+
+async def unfiltered_total(
+    repository: Any, count_cache: CountCache
+) -> tuple[int, bool]:
+    """Число строк таблицы без фильтров и признак того, что это оценка.
+
+    Большие таблицы не пересчитываются: берется статистика Postgres.
+    Небольшие считаются точно, и результат хранится в Redis до записи
+    """
+    estimate = await repository.estimate_total_count()
+    if estimate is not None and estimate >= COUNT_ESTIMATE_THRESHOLD:
+        return estimate, True
+    return await count_cache.get_or_load(repository.get_total_count), False
+
+
+async def fetch_page(
+    service: Any,
+    count: int,
+    page: int,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    count_mode: CountMode = "separate",
+    filters: Optional[dict] = None,
+    **options,
+) -> tuple[list, Optional[int], bool]:
+    """Страница списка, общее число записей и признак оценки.
+
+    filters применяются и к странице, и к подсчету, options (например
+    include) - только к странице. С курсором окно не используется:
+    условие курсора отсекает уже показанные строки и исказило бы итог
+    """
+    filters = filters or {}
+    if count_mode == "window" and with_total and not cursor:
+        items, total = await service.get_by_filter_with_total(
+            count=count, page=page, **filters, **options
+        )
+        if total is not None:
+            return items, total, False
+    else:
+        items = await service.get_by_filter(
+            count=count, page=page, cursor=cursor, **filters, **options
+        )
+
+    if not with_total:
+        return items, None, False
+    total, is_estimate = await service.get_total(**filters)
+    return items, total, is_estimate
@@ -0,0 +1,208 @@
+"""Индекс подсказок по префиксу в памяти воркера.
+
+Ключи - отсортированный массив строк "название с начала слова, SEPARATOR, id":
+"Электрический чайник" дает ключи "электрический чайник" и "чайник",
+поэтому подсказка находится по началу любого слова. Поиск - bisect до
+первого ключа с префиксом и проход вперед, O(log n + k), без запросов к
+базе. Ключи - строки, а не кортежи: сравнение и хэш строк идут целиком
+в C, и пересборка массива на сотнях тысяч ключей занимает доли секунды.
+
+Изменения через ProductService (в том числе из консьюмера RabbitMQ)
+применяются к массиву сразу и рассылаются остальным воркерам через
+pub/sub. Полная загрузка из базы идет в фоне при старте и после
+переподписки на канал, когда часть сообщений могла потеряться
+"""
+
+import asyncio
+import bisect
+import json
+from typing import Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+from cache import CACHE_KEY_PREFIX, subscribe_channel
+from redis_client import redis_call
+
+
+# Отделяет название от id в ключе и меньше любого символа названия,
+# поэтому ключи упорядочены по названию, а при равных названиях - по id
+SEPARATOR = "\0"
+
+# Пачки с большим числом ключей применяются одной пересборкой массива:
+# вставка bisect.insort сдвигает весь хвост списка и на пачке из тысяч
+# ключей стоит секунды
+SMALL_BATCH = 64
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.replace(SEPARATOR, " ").casefold().split())
+
+
+def _keys(entity_id: UUID, name: str) -> list[str]:
+    words = normalize(name).split(" ")
+    suffix = f"{SEPARATOR}{entity_id}"
+    return [" ".join(words[i:]) + suffix for i in range(len(words)) if words[i]]
+
+
+def _without(keys: list[str], removed: list[str]) -> list[str]:
+    """Отсортированный keys без ключей отсортированного removed"""
+    result = []
+    start = 0
+    for key in removed:
+        i = bisect.bisect_left(keys, key, start)
+        if i < len(keys) and keys[i] == key:
+            result.extend(keys[start:i])
+            start = i + 1
+    result.extend(keys[start:])
+    return result
+
+
+def _merged(keys: list[str], added: list[str]) -> list[str]:
+    """Слияние двух отсортированных списков"""
+    result = []
+    start = 0
+    for key in added:
+        i = bisect.bisect_left(keys, key, start)
+        result.extend(keys[start:i])
+        result.append(key)
+        start = i
+    result.extend(keys[start:])
+    return result
+
+
+class PrefixIndex:
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.channel = f"{CACHE_KEY_PREFIX}suggest:{namespace}"
+        self._keys: list[str] = []
+        self._names: dict[UUID, str] = {}
+        self._loader: Optional[Callable[[], Awaitable[Iterable]]] = None
+        self._load_task: Optional[asyncio.Task] = None
+        # Изменения, пришедшие во время загрузки: применяются к новому
+        # массиву после нее, иначе снимок из базы их бы затер
+        self._pending: Optional[list[tuple[UUID, Optional[str]]]] = None
+        self._reload_again = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, prefix: str, limit: int = 10) -> list[tuple[UUID, str]]:
+        """До limit пар (id, название), у которых слово начинается с prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        found = {}
+        i = bisect.bisect_left(self._keys, prefix)
+        while i < len(self._keys) and len(found) < limit:
+            key = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            entity_id = UUID(key.rpartition(SEPARATOR)[2])
+            found.setdefault(entity_id, self._names[entity_id])
+            i += 1
+        return list(found.items())
+
+    def _apply(self, rows: list[tuple[UUID, Optional[str]]]) -> None:
+        """Добавляет, переименовывает (name) или удаляет (None) записи"""
+        if self._pending is not None:
+            self._pending.extend(rows)
+
+        removed = []
+        added = []
+        # Для повторного id в пачке важна только последняя запись
+        for entity_id, name in dict(rows).items():
+            old_name = self._names.pop(entity_id, None)
+            if old_name is not None:
+                removed.extend(_keys(entity_id, old_name))
+            if name is not None:
+                self._names[entity_id] = name
+                added.extend(_keys(entity_id, name))
+
+        if len(removed) + len(added) <= SMALL_BATCH:
+            for key in removed:
+                i = bisect.bisect_left(self._keys, key)
+                if i < len(self._keys) and self._keys[i] == key:
+                    del self._keys[i]
+            for key in added:
+                bisect.insort(self._keys, key)
+            return
+
+        # Остальное - одна пересборка: позиции ключей ищутся bisect, а
+        # массив собирается срезами между ними, копирование идет в C
+        keys = self._keys
+        if removed:
+            keys = _without(keys, sorted(removed))
+        if added:
+            keys = _merged(keys, sorted(added))
+        self._keys = keys
+
+    async def put(self, entity_id: UUID, name: str) -> None:
+        await self.put_many([(entity_id, name)])
+
+    async def put_many(self, rows: Iterable[tuple[UUID, str]]) -> None:
+        """Добавляет или переименовывает записи здесь и в остальных воркерах"""
+        rows = [(entity_id, name) for entity_id, name in rows]
+        self._apply(rows)
+        await self._publish(rows)
+
+    async def remove(self, entity_id: UUID) -> None:
+        self._apply([(entity_id, None)])
+        await self._publish([(entity_id, None)])
+
+    async def _publish(self, rows: list[tuple[UUID, Optional[str]]]) -> None:
+        payload = json.dumps([[str(entity_id), name] for entity_id, name in rows])
+        await redis_call(lambda client: client.publish(self.channel, payload))
+
+    def on_message(self, data: str) -> None:
+        # Свои же изменения тоже приходят обратно, повторное применение
+        # ничего не меняет
+        self._apply([(UUID(entity_id), name) for entity_id, name in json.loads(data)])
+
+    def start(self, loader: Callable[[], Awaitable[Iterable[tuple[UUID, str]]]]):
+        """Подписка на изменения и фоновая загрузка из базы.
+
+        loader возвращает все пары (id, название)
+        """
+        self._loader = loader
+        subscribe_channel(self.channel, self.on_message, self.reload)
+        self.reload()
+
+    def reload(self) -> None:
+        """Запускает полную загрузку, если она еще не идет"""
+        if self._load_task is not None and not self._load_task.done():
+            # Снимок текущей загрузки мог быть сделан до потери сообщений
+            self._reload_again = True
+            return
+        self._reload_again = False
+        self._load_task = asyncio.get_running_loop().create_task(self._load())
+
+    async def _load(self) -> None:
+        while True:
+            self._pending = []
+            try:
+                rows = await self._loader()
+                names = {entity_id: name for entity_id, name in rows}
+            except Exception as e:
+                print(f"Не удалось загрузить индекс подсказок {self.namespace}: {e}")
+                return
+            finally:
+                pending, self._pending = self._pending, None
+
+            self._names = names
+            self._keys = sorted(
+                key
+                for entity_id, name in names.items()
+                for key in _keys(entity_id, name)
+            )
+            self._apply(pending)
+            if not self._reload_again:
+                return
+            self._reload_again = False
+
+    async def stop(self) -> None:
+        if self._load_task is not None:
+            self._load_task.cancel()
+            try:
+                await self._load_task
+            except asyncio.CancelledError:
+                pass
@@ -1,44 +1,53 @@
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
-from litestar import Controller, delete, get, post, put
-from litestar.exceptions import NotFoundException
+from dto import ProductFacets, ProductSuggestion
+from litestar import Controller, MediaType, Response, delete, get, post, put
 from litestar.params import Body, Parameter
+from pagination import CountMode, fetch_page, next_cursor
 from product_service import ProductService
-from schemas import ProductCreate, ProductResponse, ProductUpdate
-from redis_client import get_redis_client
+from schemas import ProductBulkResponse, ProductCreate, ProductResponse, ProductUpdate
+
+
+def product_filters(
+    category: Optional[str] = None,
+    in_stock: Optional[bool] = None,
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+) -> dict:
+    """Фильтры ProductRepository из query-параметров, пустые отбрасываются"""
+    filters = {}
+    if category:
+        filters["category"] = category
+    if in_stock is not None:
+        filters["in_stock"] = in_stock
+    if price_min is not None:
+        filters["price_min"] = price_min
+    if price_max is not None:
+        filters["price_max"] = price_max
+    return filters
 
 
 class ProductController(Controller):
     path = "/products"
     tags = ["Product Management"]
 
-    PRODUCT_CACHE_TTL = 600  # 10 минут
-
     @get("/get_product/{product_id:uuid}")
     async def get_product_by_id(
         self, product_service: ProductService, product_id: UUID
-    ) -> ProductResponse:
-        """Get product by ID"""
-        redis_client = await get_redis_client()
-        cache_key = f"product:{product_id}"
-
-        cached_product = await redis_client.get(cache_key)
-        if cached_product:
-            return ProductResponse.model_validate_json(cached_product)
-
-        product = await product_service.get_by_id(product_id)
-        if not product:
-            raise NotFoundException(detail=f"Product with ID {product_id} not found")
-
-        product_response = ProductResponse.model_validate(product)
-        await redis_client.setex(
-            cache_key,
-            self.PRODUCT_CACHE_TTL,
-            product_response.model_dump_json()
-        )
+    ) -> Response[ProductResponse]:
+        """Get product by ID, served as cached JSON bytes"""
+        product = await product_service.get_json_by_id(product_id)
+        return Response(product, media_type=MediaType.JSON)
 
-        return product_response
+    @get("/batch")
+    async def get_products_batch(
+        self,
+        product_service: ProductService,
+        ids: list[UUID] = Parameter(min_items=1, max_items=100),
+    ) -> list[ProductResponse]:
+        """Get several products by ID, unknown IDs are skipped"""
+        return await product_service.get_by_ids(ids)
 
     @get("/get_all_products")
     async def get_all_products(
@@ -46,35 +55,79 @@ class ProductController(Controller):
         product_service: ProductService,
         count: int = Parameter(gt=0, le=100, default=10),
         page: int = Parameter(gt=0, default=1),
+        cursor: Optional[str] = Parameter(default=None),
         category: Optional[str] = Parameter(default=None),
         in_stock: Optional[bool] = Parameter(default=None),
         price_min: Optional[float] = Parameter(default=None, ge=0),
         price_max: Optional[float] = Parameter(default=None, ge=0),
+        with_total: bool = Parameter(default=True),
+        count_mode: CountMode = Parameter(default="separate"),
     ) -> dict:
         """Get all products with pagination and filtering"""
-        filters = {}
-        if category:
-            filters["category"] = category
-        if in_stock is not None:
-            filters["in_stock"] = in_stock
-        if price_min is not None:
-            filters["price_min"] = price_min
-        if price_max is not None:
-            filters["price_max"] = price_max
-
-        products = await product_service.get_by_filter(
-            count=count, page=page, **filters
+        filters = product_filters(category, in_stock, price_min, price_max)
+
+        products, total_count, total_is_estimate = await fetch_page(
+            product_service, count, page, cursor, with_total, count_mode, filters
         )
-        total_count = await product_service.get_total_count(**filters)
 
         return {
             "products": products,
             "total_count": total_count,
+            "total_is_estimate": total_is_estimate,
             "page": page,
             "count": count,
+            "next_cursor": next_cursor(products, count),
             "filters": filters,
         }
 
+    @get("/search")
+    async def search_products(
+        self,
+        product_service: ProductService,
+        q: str = Parameter(min_length=1, max_length=200),
+        count: int = Parameter(gt=0, le=100, default=10),
+        page: int = Parameter(gt=0, default=1),
+        category: Optional[str] = Parameter(default=None),
+        in_stock: Optional[bool] = Parameter(default=None),
+        price_min: Optional[float] = Parameter(default=None, ge=0),
+        price_max: Optional[float] = Parameter(default=None, ge=0),
+    ) -> dict:
+        """Search products by name and description, best matches first"""
+        filters = product_filters(category, in_stock, price_min, price_max)
+        products = await product_service.search(q, count=count, page=page, **filters)
+
+        return {
+            "products": products,
+            "query": q,
+            "page": page,
+            "count": count,
+            "filters": filters,
+        }
+
+    @get("/facets")
+    async def get_product_facets(
+        self,
+        product_service: ProductService,
+        category: Optional[str] = Parameter(default=None),
+        in_stock: Optional[bool] = Parameter(default=None),
+        price_min: Optional[float] = Parameter(default=None, ge=0),
+        price_max: Optional[float] = Parameter(default=None, ge=0),
+    ) -> Response[ProductFacets]:
+        """Per-category and price-bucket counts under the get_all_products filters"""
+        filters = product_filters(category, in_stock, price_min, price_max)
+        facets = await product_service.get_facets_json(**filters)
+        return Response(facets, media_type=MediaType.JSON)
+
+    @get("/suggest")
+    async def suggest_products(
+        self,
+        product_service: ProductService,
+        prefix: str = Parameter(min_length=1, max_length=100),
+        limit: int = Parameter(gt=0, le=20, default=10),
+    ) -> list[ProductSuggestion]:
+        """Product name suggestions for a typed prefix, served from memory"""
+        return product_service.suggest(prefix, limit)
+
     @post("/create_product")
     async def create_product(
         self,
@@ -82,9 +135,16 @@ class ProductController(Controller):
         data: ProductCreate = Body(media_type="application/json"),
     ) -> ProductResponse:
         """Create a new product"""
-        product = await product_service.create(data)
+        return await product_service.create(data)
 
-        return ProductResponse.model_validate(product)
+    @post("/bulk")
+    async def bulk_create_products(
+        self,
+        product_service: ProductService,
+        data: list[dict[str, Any]] = Body(media_type="application/json"),
+    ) -> ProductBulkResponse:
+        """Create many products at once, invalid rows are reported by index"""
+        return await product_service.bulk_create(data)
 
     @put("/update_product/{product_id:uuid}")
     async def update_product(
@@ -94,30 +154,11 @@ class ProductController(Controller):
         data: ProductUpdate = Body(media_type="application/json"),
     ) -> ProductResponse:
         """Update product"""
-        redis_client = await get_redis_client()
-        product = await product_service.update(product_id, data)
-        if not product:
-            raise NotFoundException(detail=f"Product with ID {product_id} not found")
-
-        product_response = ProductResponse.model_validate(product)
-        await redis_client.setex(
-            f"product:{product_id}",
-            self.PRODUCT_CACHE_TTL,
-            product_response.model_dump_json()
-        )
-
-        return product_response
+        return await product_service.update(product_id, data)
 
     @delete("/delete_product/{product_id:uuid}")
     async def delete_product(
-            self, product_service: ProductService, product_id: UUID
+        self, product_service: ProductService, product_id: UUID
     ) -> None:
         """Delete product"""
-        redis_client = await get_redis_client()
-        success = await product_service.delete(product_id)
-        if not success:
-            raise NotFoundException(detail=f"Product with ID {product_id} not found")
-
-        await redis_client.delete(f"product:{product_id}")
-
-        return
\ No newline at end of file
+        await product_service.delete(product_id)
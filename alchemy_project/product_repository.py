@@ -1,15 +1,31 @@
 from typing import List, Optional
 from uuid import UUID
 
+from base_repository import BaseRepository
 from schemas import ProductCreate, ProductUpdate
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from tables import Product
+from sqlalchemy import Select, case, func, insert, literal, or_, select
+from tables import PRODUCT_SEARCH_CONFIG, OrderItem, Product, product_search_vector
 
 
-class ProductRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+# Верхние границы корзин цены для фасетов, последняя корзина открыта сверху
+PRICE_BUCKET_EDGES = (10.0, 50.0, 100.0, 500.0, 1000.0)
+
+
+class ProductRepository(BaseRepository):
+    model = Product
+
+    def _filter_conditions(self, **kwargs) -> list:
+        conditions = []
+        for key, value in kwargs.items():
+            if key == "price_min":
+                conditions.append(Product.price >= value)
+            elif key == "price_max":
+                conditions.append(Product.price <= value)
+            elif key == "name_query":
+                conditions.append(Product.name.ilike(f"%{value}%"))
+            elif key in Product.__table__.columns:
+                conditions.append(getattr(Product, key) == value)
+        return conditions
 
     async def get_by_id(self, product_id: UUID) -> Optional[Product]:
         result = await self.session.execute(
@@ -18,27 +34,91 @@ class ProductRepository:
         return result.scalar_one_or_none()
 
     async def get_by_filter(
-        self, count: int = 10, page: int = 1, **kwargs
+        self, count: int = 10, page: int = 1, cursor: Optional[str] = None, **kwargs
     ) -> List[Product]:
-        offset = (page - 1) * count
-        query = select(Product)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Product, key):
-                    if key == "price_min":
-                        query = query.where(Product.price >= value)
-                    elif key == "price_max":
-                        query = query.where(Product.price <= value)
-                    elif key == "name_query":
-                        query = query.where(Product.name.ilike(f"%{value}%"))
-                    else:
-                        query = query.where(getattr(Product, key) == value)
-
-        query = query.offset(offset).limit(count)
+        query = self._apply_filters(select(Product), **kwargs)
+        query = self._paginate(query, count, page, cursor)
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def search(
+        self, query: str, count: int = 10, page: int = 1, **kwargs
+    ) -> List[Product]:
+        """Поиск по названию и описанию, лучшие совпадения первыми"""
+        postgresql = self.session.bind.dialect.name == "postgresql"
+        statement = self._apply_filters(self._search_query(query, postgresql), **kwargs)
+        statement = statement.offset((page - 1) * count).limit(count)
+        result = await self.session.execute(statement)
+        return list(result.scalars().all())
+
+    async def get_facet_counts(self, **kwargs) -> List[tuple[str, int, int]]:
+        """Число продуктов под фильтром по парам (категория, корзина цены).
+
+        Один GROUP BY за один проход по таблице: строк в ответе не больше,
+        чем категорий, умноженных на корзины, а счетчики по категориям и по
+        корзинам сервис получает их суммированием. Корзина - индекс в
+        PRICE_BUCKET_EDGES, у последней открытой корзины он равен длине
+        """
+        result = await self.session.execute(self._facet_query(**kwargs))
+        return [tuple(row) for row in result.all()]
+
+    def _facet_query(self, **kwargs) -> Select:
+        # GROUP BY по имени метки: с повтором CASE Postgres получил бы два
+        # выражения с разными параметрами и не счел бы их одинаковыми
+        bucket = case(
+            *(
+                (Product.price < edge, index)
+                for index, edge in enumerate(PRICE_BUCKET_EDGES)
+            ),
+            else_=len(PRICE_BUCKET_EDGES),
+        ).label("bucket")
+        return self._apply_filters(
+            select(Product.category, bucket, func.count()), **kwargs
+        ).group_by(Product.category, "bucket")
+
+    async def get_order_ids(self, product_id: UUID) -> List[UUID]:
+        """id заказов с этим продуктом, их позиции удалит ON DELETE CASCADE"""
+        result = await self.session.execute(
+            select(OrderItem.order_id)
+            .where(OrderItem.product_id == product_id)
+            .distinct()
+        )
+        return list(result.scalars().all())
+
+    async def get_names(self) -> List[tuple[UUID, str]]:
+        """id и название всех продуктов для индекса подсказок"""
+        result = await self.session.execute(select(Product.id, Product.name))
+        return [tuple(row) for row in result.all()]
+
+    def _search_query(self, query: str, postgresql: bool) -> Select:
+        """SELECT для поиска с ранжированием.
+
+        В Postgres строка подходит по полнотекстовому поиску или по похожести
+        названия на запрос (pg_trgm, <%), оба условия обслуживают GIN-индексы.
+        Ранг - сумма ts_rank и word_similarity. В остальных базах (тесты на
+        sqlite) - ILIKE по названию и описанию без ранжирования
+        """
+        if not postgresql:
+            return (
+                select(Product)
+                .where(
+                    or_(
+                        Product.name.icontains(query, autoescape=True),
+                        Product.description.icontains(query, autoescape=True),
+                    )
+                )
+                .order_by(Product.name, Product.id)
+            )
+
+        vector = product_search_vector()
+        tsquery = func.websearch_to_tsquery(PRODUCT_SEARCH_CONFIG, query)
+        rank = func.ts_rank(vector, tsquery) + func.word_similarity(query, Product.name)
+        return (
+            select(Product)
+            .where(or_(vector.op("@@")(tsquery), literal(query).op("<%")(Product.name)))
+            .order_by(rank.desc(), Product.id)
+        )
+
     async def get_in_stock(self, count: int = 10, page: int = 1) -> List[Product]:
         offset = (page - 1) * count
         result = await self.session.execute(
@@ -46,24 +126,6 @@ class ProductRepository:
         )
         return list(result.scalars().all())
 
-    async def get_total_count(self, **kwargs) -> int:
-        query = select(Product)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(Product, key):
-                    if key == "price_min":
-                        query = query.where(Product.price >= value)
-                    elif key == "price_max":
-                        query = query.where(Product.price <= value)
-                    elif key == "name_query":
-                        query = query.where(Product.name.ilike(f"%{value}%"))
-                    else:
-                        query = query.where(getattr(Product, key) == value)
-
-        result = await self.session.execute(query)
-        return len(result.scalars().all())
-
     async def create(self, product_data: ProductCreate) -> Product:
         try:
             product = Product(
@@ -74,41 +136,49 @@ class ProductRepository:
                 in_stock=product_data.in_stock,
             )
             self.session.add(product)
-            await self.session.commit()
+            await self._commit()
             await self.session.refresh(product)
             return product
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback()
+            raise e
+
+    async def bulk_create(self, products: List[ProductCreate]) -> List[UUID]:
+        # Один INSERT ... VALUES (...), (...) RETURNING id на пачку строк:
+        # SQLAlchemy сам режет список на пачки (insertmanyvalues)
+        if not products:
+            return []
+        try:
+            result = await self.session.execute(
+                # Порядок id совпадает с порядком строк: по нему сервис
+                # сопоставляет id с названиями
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                [product.model_dump() for product in products],
+            )
+            ids = list(result.scalars().all())
+            await self._commit()
+            return ids
+        except Exception as e:
+            await self._rollback()
             raise e
 
     async def update(
         self, product_id: UUID, product_data: ProductUpdate
     ) -> Optional[Product]:
         try:
-            product = await self.get_by_id(product_id)
-            if not product:
-                return None
-
             update_data = product_data.model_dump(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(product, field, value)
-
-            await self.session.commit()
-            await self.session.refresh(product)
+            product = await self._update_returning(product_id, update_data)
+            await self._commit()
             return product
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback()
             raise e
 
     async def delete(self, product_id: UUID) -> bool:
         try:
-            product = await self.get_by_id(product_id)
-            if not product:
-                return False
-
-            await self.session.delete(product)
-            await self.session.commit()
-            return True
+            deleted = await self._delete_returning(product_id)
+            await self._commit()
+            return deleted
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback()
             raise e
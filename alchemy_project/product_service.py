@@ -1,38 +1,185 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
+import msgspec
+from batch_loader import BatchLoader, load_by_id
+from cache import (
+    CountCache,
+    EntityCache,
+    FilterCache,
+    cache_ttl,
+    cached,
+    invalidate_committed,
+    invalidates,
+    invalidates_count,
+)
+from dto import (
+    CategoryFacet,
+    PriceBucketFacet,
+    ProductFacets,
+    ProductRow,
+    ProductSuggestion,
+    to_structs,
+)
 from litestar.exceptions import NotFoundException
-from product_repository import ProductRepository
-from schemas import ProductCreate, ProductResponse, ProductUpdate
+from order_service import order_cache
+from pagination import unfiltered_total
+from prefix_index import PrefixIndex
+from product_repository import PRICE_BUCKET_EDGES, ProductRepository
+from pydantic import ValidationError
+from schemas import (
+    ProductBulkError,
+    ProductBulkResponse,
+    ProductCreate,
+    ProductResponse,
+    ProductUpdate,
+)
+from unit_of_work import after_commit
+
+product_cache = EntityCache("product", ProductResponse, ttl=cache_ttl("product", 600))
+product_count = CountCache("product", ttl=cache_ttl("product_count", 60))
+product_facets = FilterCache("facets:product", ttl=cache_ttl("product_facets", 60))
+product_suggestions = PrefixIndex("product")
 
 
 class ProductService:
-    def __init__(self, repository: ProductRepository):
+    def __init__(
+        self, repository: ProductRepository, loader: Optional[BatchLoader] = None
+    ):
         self.repository = repository
+        self.loader = loader
 
+    @cached(product_cache)
     async def get_by_id(self, product_id: UUID) -> ProductResponse:
         """Получить продукт по ID"""
-        product = await self.repository.get_by_id(product_id)
+        return await self._load(product_id)
+
+    async def get_json_by_id(self, product_id: UUID) -> bytes:
+        """Получить продукт по ID в виде готового JSON для ответа"""
+        return await product_cache.get_or_load_json(
+            product_id, lambda: self._load(product_id)
+        )
+
+    async def _load(self, product_id: UUID) -> ProductResponse:
+        product = await load_by_id(self.loader, self.repository, product_id)
         if not product:
             raise NotFoundException(detail=f"Product with ID {product_id} not found")
         return ProductResponse.model_validate(product)
 
+    async def get_by_ids(self, product_ids: List[UUID]) -> List[ProductResponse]:
+        """Получить несколько продуктов: кэш одним MGET, промахи одним запросом"""
+        return await product_cache.get_many_or_load(product_ids, self._load_by_ids)
+
+    async def _load_by_ids(
+        self, product_ids: List[UUID]
+    ) -> dict[UUID, ProductResponse]:
+        products = await self.repository.get_by_ids(product_ids)
+        return {
+            product.id: ProductResponse.model_validate(product) for product in products
+        }
+
     async def get_by_filter(
         self, count: int = 10, page: int = 1, **kwargs
-    ) -> List[ProductResponse]:
+    ) -> List[ProductRow]:
         """Получить продукты с фильтрацией"""
         products = await self.repository.get_by_filter(count=count, page=page, **kwargs)
-        return [ProductResponse.model_validate(product) for product in products]
+        return to_structs(products, ProductRow)
+
+    async def get_by_filter_with_total(
+        self, count: int = 10, page: int = 1, **kwargs
+    ) -> tuple[List[ProductRow], Optional[int]]:
+        """Получить продукты и их общее количество одним запросом"""
+        products, total = await self.repository.get_by_filter_with_total(
+            count=count, page=page, **kwargs
+        )
+        return to_structs(products, ProductRow), total
+
+    async def search(
+        self, query: str, count: int = 10, page: int = 1, **kwargs
+    ) -> List[ProductRow]:
+        """Найти продукты по тексту с фильтрацией, по убыванию релевантности"""
+        products = await self.repository.search(query, count=count, page=page, **kwargs)
+        return to_structs(products, ProductRow)
+
+    async def get_facets_json(self, **kwargs) -> bytes:
+        """Счетчики по категориям и корзинам цены под фильтром, готовый JSON"""
+        return await product_facets.get_or_load(
+            kwargs, lambda: self._load_facets(kwargs)
+        )
+
+    async def _load_facets(self, filters: dict) -> bytes:
+        rows = await self.repository.get_facet_counts(**filters)
+        categories = {}
+        buckets = [0] * (len(PRICE_BUCKET_EDGES) + 1)
+        for category, bucket, count in rows:
+            categories[category] = categories.get(category, 0) + count
+            buckets[bucket] += count
+
+        edges = (0.0, *PRICE_BUCKET_EDGES, None)
+        facets = ProductFacets(
+            total=sum(buckets),
+            categories=[
+                CategoryFacet(category=category, count=count)
+                for category, count in sorted(
+                    categories.items(), key=lambda item: (-item[1], item[0])
+                )
+            ],
+            price_buckets=[
+                PriceBucketFacet(
+                    price_min=edges[index], price_max=edges[index + 1], count=count
+                )
+                for index, count in enumerate(buckets)
+            ],
+            filters=filters,
+        )
+        return msgspec.json.encode(facets)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[ProductSuggestion]:
+        """Подсказки по началу слова в названии, из памяти без запроса к базе"""
+        return [
+            ProductSuggestion(id=product_id, name=name)
+            for product_id, name in product_suggestions.search(prefix, limit)
+        ]
 
     async def get_total_count(self, **kwargs) -> int:
         """Получить общее количество продуктов"""
         return await self.repository.get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs) -> tuple[int, bool]:
+        """Общее количество продуктов и признак того, что это оценка"""
+        if kwargs:
+            return await self.get_total_count(**kwargs), False
+        return await unfiltered_total(self.repository, product_count)
+
+    @invalidates_count(product_count)
     async def create(self, product_data: ProductCreate) -> ProductResponse:
         """Создать новый продукт"""
         product = await self.repository.create(product_data)
+        await after_commit(
+            lambda: product_suggestions.put(product.id, product_data.name)
+        )
         return ProductResponse.model_validate(product)
 
+    @invalidates_count(product_count)
+    async def bulk_create(self, rows: List[dict]) -> ProductBulkResponse:
+        """Создать продукты пачкой, невалидные строки пропускаются"""
+        products = []
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                products.append(ProductCreate.model_validate(row))
+            except ValidationError as e:
+                row_errors = e.errors(include_url=False, include_context=False)
+                errors.append(ProductBulkError(index=index, errors=row_errors))
+
+        ids = await self.repository.bulk_create(products)
+        names = [
+            (product_id, product.name) for product_id, product in zip(ids, products)
+        ]
+        await after_commit(lambda: product_suggestions.put_many(names))
+        return ProductBulkResponse(created_count=len(ids), ids=ids, errors=errors)
+
+    @invalidates(product_cache)
     async def update(
         self, product_id: UUID, product_data: ProductUpdate
     ) -> ProductResponse:
@@ -40,10 +187,24 @@ class ProductService:
         product = await self.repository.update(product_id, product_data)
         if not product:
             raise NotFoundException(detail=f"Product with ID {product_id} not found")
+        # Продукт встроен в позиции закэшированных заказов
+        await invalidate_committed(
+            order_cache, await self.repository.get_order_ids(product_id)
+        )
+        if "name" in product_data.model_fields_set:
+            await after_commit(
+                lambda: product_suggestions.put(product_id, product_data.name)
+            )
         return ProductResponse.model_validate(product)
 
+    @invalidates(product_cache)
+    @invalidates_count(product_count)
     async def delete(self, product_id: UUID) -> None:
         """Удалить продукт"""
+        # Позиции заказов с продуктом удалит ON DELETE CASCADE
+        order_ids = await self.repository.get_order_ids(product_id)
         success = await self.repository.delete(product_id)
         if not success:
             raise NotFoundException(detail=f"Product with ID {product_id} not found")
+        await invalidate_committed(order_cache, order_ids)
+        await after_commit(lambda: product_suggestions.remove(product_id))
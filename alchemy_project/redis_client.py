@@ -1,42 +1,164 @@
+import asyncio
 import os
-from typing import Optional
+import time
+from typing import Any, Awaitable, Callable, Optional
 
 import redis.asyncio as redis
+from redis.exceptions import RedisError
 
 
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+# Короткие таймауты ограничивают задержку запроса, пока Redis недоступен
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+REDIS_FAILURE_THRESHOLD = int(os.getenv("REDIS_FAILURE_THRESHOLD", 3))
+REDIS_RETRY_INTERVAL = float(os.getenv("REDIS_RETRY_INTERVAL", 5))
+
+REDIS_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
 _redis_client: Optional[redis.Redis] = None
+_reconnect_task: Optional[asyncio.Task] = None
+
+
+class CircuitBreaker:
+    """Размыкается после нескольких ошибок подряд.
+
+    Пока цепь разомкнута, Redis не используется вовсе, а переподключение
+    проверяет фоновая задача
+    """
+
+    def __init__(self, failure_threshold: int):
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold and not self.is_open:
+            self.open()
+
+    def open(self) -> None:
+        self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(REDIS_FAILURE_THRESHOLD)
+
+
+def _create_client() -> redis.Redis:
+    # Ответы не декодируются: JSON из кэша отдается клиенту байтами как есть
+    return redis.Redis(
+        host=REDIS_HOST,
+        port=6379,
+        db=0,
+        decode_responses=False,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+    )
 
 
 async def get_redis_client() -> Optional[redis.Redis]:
-    """Получает или создаёт Redis клиент"""
+    """Получает или создаёт Redis клиент.
+
+    Возвращает None, пока Redis недоступен - вызывающий код работает
+    без кэша, а не ждет таймаут подключения на каждом запросе
+    """
     global _redis_client
 
+    if breaker.is_open:
+        _ensure_reconnect()
+        return None
+
     if _redis_client is None:
+        client = _create_client()
         try:
-            _redis_client = redis.Redis(
-                host=REDIS_HOST,
-                port=6379,
-                db=0,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True
-            )
             # Проверяем подключение
-            await _redis_client.ping()
+            await client.ping()
             print("Redis подключен успешно")
-        except Exception as e:
+        except REDIS_ERRORS as e:
             print(f"Не удалось подключиться к Redis: {e}")
-            _redis_client = None
+            await client.close()
+            breaker.open()
+            _ensure_reconnect()
+            return None
+        _redis_client = client
+        breaker.record_success()
 
     return _redis_client
 
 
+def report_redis_error(error: Exception) -> None:
+    """Учитывает ошибку операции с Redis и размыкает цепь после нескольких подряд"""
+    breaker.record_failure()
+    if breaker.is_open:
+        print(f"Redis недоступен, кэш отключен: {error}")
+        _ensure_reconnect()
+
+
+async def redis_call(
+    action: Callable[[redis.Redis], Awaitable[Any]], default: Any = None
+) -> Any:
+    """Выполняет операцию с Redis или возвращает default, если Redis недоступен"""
+    client = await get_redis_client()
+    if client is None:
+        return default
+
+    try:
+        result = await action(client)
+    except REDIS_ERRORS as e:
+        report_redis_error(e)
+        return default
+
+    breaker.record_success()
+    return result
+
+
+def _ensure_reconnect() -> None:
+    global _reconnect_task
+
+    loop = asyncio.get_running_loop()
+    if (
+        _reconnect_task is None
+        or _reconnect_task.done()
+        or _reconnect_task.get_loop() is not loop
+    ):
+        _reconnect_task = loop.create_task(_reconnect())
+
+
+async def _reconnect() -> None:
+    """Фоновая проверка Redis, замыкает цепь после успешного ping"""
+    global _redis_client
+
+    while breaker.is_open:
+        await asyncio.sleep(REDIS_RETRY_INTERVAL)
+        client = _create_client()
+        try:
+            await client.ping()
+        except REDIS_ERRORS:
+            await client.close()
+            continue
+
+        old_client, _redis_client = _redis_client, client
+        breaker.record_success()
+        print("Redis снова доступен")
+        if old_client is not None:
+            await old_client.close()
+
+
 async def close_redis():
     """Закрывает соединение с Redis"""
-    global _redis_client
+    global _redis_client, _reconnect_task
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
     if _redis_client:
         await _redis_client.close()
         _redis_client = None
-        print("Redis соединение закрыто")
\ No newline at end of file
+        print("Redis соединение закрыто")
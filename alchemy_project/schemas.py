@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class UserBase(BaseModel):
@@ -30,11 +30,6 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
-class UsersResponse(BaseModel):
-    users: list[UserResponse]
-    total_count: int
-
-
 class AddressBase(BaseModel):
     street: str
     city: str
@@ -96,6 +91,17 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
+class ProductBulkError(BaseModel):
+    index: int
+    errors: List[dict]
+
+
+class ProductBulkResponse(BaseModel):
+    created_count: int
+    ids: List[UUID]
+    errors: List[ProductBulkError] = []
+
+
 class OrderItemBase(BaseModel):
     product_id: UUID
     quantity: int = Field(..., gt=0)
@@ -114,6 +120,10 @@ class OrderItemResponse(OrderItemBase):
     id: UUID
     order_id: UUID
     created_at: datetime
+    # Заполняется только при include=product
+    product: Optional[ProductResponse] = Field(
+        default=None, validation_alias=AliasChoices("loaded_product", "product")
+    )
 
     class Config:
         from_attributes = True
@@ -139,6 +149,7 @@ class OrderResponse(OrderBase):
     created_at: datetime
     updated_at: datetime
     items: List[OrderItemResponse] = []
+    address: Optional[AddressResponse] = None
 
     class Config:
         from_attributes = True
@@ -146,4 +157,6 @@ class OrderResponse(OrderBase):
 
 class OrdersResponse(BaseModel):
     orders: List[OrderResponse]
-    total_count: int
+    total_count: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
@@ -1,13 +1,22 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import ForeignKey, Index, String, Text, func, text
 from sqlalchemy.orm import (Mapped, declarative_base, mapped_column,
                             relationship)
 
 Base = declarative_base()
 
 
+def loaded(entity, relation: str, default=None):
+    """Значение связи, если она уже загружена, иначе default.
+
+    Схемы ответа читают связи через такие свойства: обращение к
+    незагруженной связи в async-сессии привело бы к ленивой загрузке
+    """
+    return entity.__dict__.get(relation, default)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -38,6 +47,11 @@ class User(Base):
     )
 
 
+# Индексы повторяют реальные запросы репозиториев: фильтр по равенству,
+# затем сортировка (created_at DESC, id DESC) для страниц и курсоров
+Index("ix_users_created_at_id", User.created_at.desc(), User.id.desc())
+
+
 class Address(Base):
     __tablename__ = "addresses"
 
@@ -70,6 +84,23 @@ class Address(Base):
     )
 
 
+Index(
+    "ix_addresses_user_id_created_at",
+    Address.user_id,
+    Address.created_at.desc(),
+    Address.id.desc(),
+)
+Index("ix_addresses_created_at_id", Address.created_at.desc(), Address.id.desc())
+# У пользователя не больше одного основного адреса
+Index(
+    "uq_addresses_user_id_primary",
+    Address.user_id,
+    unique=True,
+    postgresql_where=Address.is_primary,
+    sqlite_where=Address.is_primary,
+)
+
+
 class Product(Base):
     __tablename__ = "products"
 
@@ -96,6 +127,47 @@ class Product(Base):
     )
 
 
+Index(
+    "ix_products_category_created_at",
+    Product.category,
+    Product.created_at.desc(),
+    Product.id.desc(),
+)
+Index("ix_products_created_at_id", Product.created_at.desc(), Product.id.desc())
+
+# Конфигурация полнотекстового поиска. Выражение вектора в запросах
+# должно совпадать с выражением индекса, иначе Postgres его не использует
+PRODUCT_SEARCH_CONFIG = text("'russian'")
+
+
+def product_search_vector():
+    """tsvector по названию (вес A) и описанию (вес B)"""
+    return func.setweight(
+        func.to_tsvector(PRODUCT_SEARCH_CONFIG, Product.name), text("'A'")
+    ).op("||")(
+        func.setweight(
+            func.to_tsvector(
+                PRODUCT_SEARCH_CONFIG,
+                func.coalesce(Product.description, text("''")),
+            ),
+            text("'B'"),
+        )
+    )
+
+
+# Только для Postgres: GIN по tsvector и по триграммам названия (pg_trgm)
+# для нечеткого и частичного совпадения, в том числе ILIKE '%...%'
+Index(
+    "ix_products_search_vector", product_search_vector(), postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_products_name_trgm",
+    Product.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+
 class Order(Base):
     __tablename__ = "orders"
 
@@ -129,6 +201,30 @@ class Order(Base):
         passive_deletes=True,
     )
 
+    @property
+    def items(self) -> list["OrderItem"]:
+        return loaded(self, "order_items", [])
+
+    @property
+    def address(self) -> "Address | None":
+        return loaded(self, "delivery_address")
+
+
+Index(
+    "ix_orders_user_id_created_at",
+    Order.user_id,
+    Order.created_at.desc(),
+    Order.id.desc(),
+)
+Index(
+    "ix_orders_status_created_at",
+    Order.status,
+    Order.created_at.desc(),
+    Order.id.desc(),
+)
+Index("ix_orders_created_at_id", Order.created_at.desc(), Order.id.desc())
+Index("ix_orders_delivery_address_id", Order.delivery_address_id)
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -149,3 +245,11 @@ class OrderItem(Base):
 
     order: Mapped["Order"] = relationship("Order", back_populates="order_items")
     product: Mapped["Product"] = relationship("Product", back_populates="order_items")
+
+    @property
+    def loaded_product(self) -> "Product | None":
+        return loaded(self, "product")
+
+
+Index("ix_order_items_order_id", OrderItem.order_id)
+Index("ix_order_items_product_id", OrderItem.product_id)
@@ -86,3 +86,11 @@ async def order_repository(session):
     from order_repository import OrderRepository
 
     return OrderRepository(session)
+
+
+@pytest.fixture
+async def address_repository(session):
+    """Фикстура для репозитория адресов"""
+    from address_repository import AddressRepository
+
+    return AddressRepository(session)
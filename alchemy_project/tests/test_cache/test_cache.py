@@ -0,0 +1,432 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from cache import (CountCache, EntityCache, FilterCache, LocalCache, cached,
+                   evict_local, invalidates, invalidates_count, schema_version)
+from pagination import COUNT_ESTIMATE_THRESHOLD, unfiltered_total
+from redis_client import breaker
+from schemas import ProductResponse, UserResponse
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.published = []
+        self.round_trips = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.commands.append(self.redis.setex(key, ttl, value))
+        return self
+
+    def delete(self, *keys):
+        self.commands.append(self.redis.delete(*keys))
+        return self
+
+    def publish(self, channel, message):
+        self.commands.append(self.redis.publish(channel, message))
+        return self
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for command in self.commands:
+            await command
+
+
+def make_product(product_id) -> ProductResponse:
+    return ProductResponse(
+        id=product_id,
+        name="Cached product",
+        price=10.0,
+        category="Cache",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+test_cache = EntityCache("test_product", ProductResponse, ttl=60)
+
+
+class CachedService:
+    def __init__(self):
+        self.load = AsyncMock()
+
+    @cached(test_cache)
+    async def get_by_id(self, product_id, include_relations: bool = True):
+        return await self.load(product_id, include_relations)
+
+    @invalidates(test_cache)
+    async def update(self, product_id):
+        return True
+
+
+@pytest.fixture()
+def fake_redis():
+    redis = FakeRedis()
+    test_cache.local.clear()
+    breaker.record_success()
+    with patch("redis_client.get_redis_client", AsyncMock(return_value=redis)):
+        yield redis
+
+
+@pytest.mark.asyncio
+async def test_read_through(fake_redis):
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+    hits, misses = test_cache.hits, test_cache.misses
+
+    first = await service.get_by_id(product_id)
+    test_cache.local.clear()
+    second = await service.get_by_id(product_id)
+
+    assert first == second
+    service.load.assert_called_once_with(product_id, True)
+    assert fake_redis.data[test_cache.key(product_id)]
+    assert test_cache.hits - hits == 1
+    assert test_cache.misses - misses == 1
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_redis(fake_redis):
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+
+    first = await service.get_by_id(product_id)
+    fake_redis.data.clear()
+
+    with patch("redis_client.get_redis_client") as get_redis_client:
+        second = await service.get_by_id(product_id)
+
+    assert second is first
+    get_redis_client.assert_not_called()
+    service.load.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_published(fake_redis):
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+    key = test_cache.key(product_id)
+
+    await service.get_by_id(product_id)
+    await service.update(product_id)
+
+    assert test_cache.local.get(key) is None
+    assert fake_redis.published[-1][1] == key
+
+
+@pytest.mark.asyncio
+async def test_invalidate_many_in_one_round_trip(fake_redis):
+    ids = [uuid4(), uuid4()]
+    await test_cache.set_many(
+        {product_id: make_product(product_id) for product_id in ids}
+    )
+    keys = [test_cache.key(product_id) for product_id in ids]
+    round_trips = fake_redis.round_trips
+
+    await test_cache.invalidate_many(ids)
+
+    assert fake_redis.round_trips - round_trips == 1
+    assert all(test_cache.local.get(key) is None for key in keys)
+    assert all(key not in fake_redis.data for key in keys)
+    assert [message for _, message in fake_redis.published[-2:]] == keys
+
+
+def test_evict_local_from_other_worker():
+    key = test_cache.key(uuid4())
+    test_cache.local.set(key, "value")
+
+    evict_local(key)
+
+    assert test_cache.local.get(key) is None
+
+
+def test_local_cache_lru_eviction():
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+
+    assert local.get("a") == 1
+    assert local.get("b") is None
+    assert local.get("c") == 3
+
+
+def test_local_cache_ttl_expiry():
+    local = LocalCache(maxsize=10, ttl=60)
+    with patch("cache.time.monotonic", return_value=1000.0):
+        local.set("a", 1)
+    with patch("cache.time.monotonic", return_value=1059.0):
+        assert local.get("a") == 1
+    with patch("cache.time.monotonic", return_value=1061.0):
+        assert local.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_not_cached(fake_redis):
+    service = CachedService()
+    service.load.return_value = None
+
+    assert await service.get_by_id(uuid4()) is None
+    assert fake_redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_extra_arguments_bypass_cache(fake_redis):
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+
+    await service.get_by_id(product_id, include_relations=False)
+
+    assert fake_redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_on_update(fake_redis):
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+
+    await service.get_by_id(product_id)
+    await service.update(product_id)
+    await service.get_by_id(product_id)
+
+    assert service.load.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable():
+    test_cache.local.clear()
+    service = CachedService()
+    product_id = uuid4()
+    service.load.return_value = make_product(product_id)
+
+    with patch("redis_client.get_redis_client", AsyncMock(return_value=None)):
+        assert (await service.get_by_id(product_id)).id == product_id
+        await service.update(product_id)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(fake_redis):
+    product_id = uuid4()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return make_product(product_id)
+
+    results = await asyncio.gather(
+        *(test_cache.get_or_load(product_id, loader) for _ in range(20))
+    )
+
+    assert calls == 1
+    assert {result.id for result in results} == {product_id}
+    assert test_cache.key(product_id) not in test_cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_error(fake_redis):
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db is down")
+
+    results = await asyncio.gather(
+        *(test_cache.get_or_load("same", loader) for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "same" not in test_cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_lock_waiter_reads_value_from_other_worker(fake_redis):
+    cache = EntityCache("test_locked", ProductResponse, ttl=60, stampede_mode="lock")
+    product_id = uuid4()
+    key = cache.key(product_id)
+    # Блокировку держит другой воркер, который вскоре запишет значение
+    fake_redis.data[f"{key}:lock"] = "1"
+    loader = AsyncMock()
+
+    async def other_worker():
+        await asyncio.sleep(0.05)
+        fake_redis.data[key] = make_product(product_id).model_dump_json().encode()
+
+    result, _ = await asyncio.gather(
+        cache.get_or_load(product_id, loader), other_worker()
+    )
+
+    assert result.id == product_id
+    loader.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lock_released_after_load(fake_redis):
+    cache = EntityCache("test_locked", ProductResponse, ttl=60, stampede_mode="lock")
+    product_id = uuid4()
+
+    await cache.get_or_load(
+        product_id, AsyncMock(return_value=make_product(product_id))
+    )
+
+    assert f"{cache.key(product_id)}:lock" not in fake_redis.data
+    assert cache.key(product_id) in fake_redis.data
+
+
+def test_early_expiration_probability():
+    cache = EntityCache("test_early", ProductResponse, ttl=60, stampede_mode="early")
+    cache.load_time = 0.1
+
+    with patch("cache.random.random", return_value=0.5):
+        # -0.1 * ln(0.5) ~ 69 мс до истечения
+        assert cache._expires_early(50)
+        assert not cache._expires_early(1000)
+    assert not cache._expires_early(-1)
+
+
+@pytest.mark.asyncio
+async def test_get_many_or_load_batches_misses(fake_redis):
+    cached_id, missing_id, unknown_id = uuid4(), uuid4(), uuid4()
+    await test_cache.set(cached_id, make_product(cached_id))
+    test_cache.local.clear()
+    fake_redis.round_trips = 0
+
+    async def loader(ids):
+        assert ids == [missing_id, unknown_id]
+        return {missing_id: make_product(missing_id)}
+
+    result = await test_cache.get_many_or_load(
+        [missing_id, cached_id, unknown_id, missing_id], loader
+    )
+
+    assert [product.id for product in result] == [missing_id, cached_id]
+    # Один MGET и один pipeline на запись
+    assert fake_redis.round_trips == 2
+    assert test_cache.key(missing_id) in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_json_serves_cached_bytes(fake_redis):
+    product_id = uuid4()
+    product = make_product(product_id)
+    loader = AsyncMock(return_value=product)
+
+    with patch.object(EntityCache, "_dump", wraps=EntityCache._dump) as dump:
+        raw = await test_cache.get_or_load_json(product_id, loader)
+    assert raw == product.model_dump_json().encode()
+    # При промахе отдается тот же JSON, что записан в Redis
+    assert fake_redis.data[test_cache.key(product_id)] is raw
+    dump.assert_called_once()
+
+    test_cache.local.clear()
+    with patch.object(ProductResponse, "model_validate_json") as parse:
+        assert await test_cache.get_or_load_json(product_id, loader) == raw
+        assert await test_cache.get_or_load_json(product_id, loader) == raw
+    parse.assert_not_called()
+    loader.assert_awaited_once()
+
+
+def test_cache_key_depends_on_schema():
+    assert schema_version(ProductResponse) != schema_version(UserResponse)
+    assert schema_version(ProductResponse) in test_cache.key(uuid4())
+
+
+test_count = CountCache("test_product", ttl=60)
+
+
+class CountedService:
+    @invalidates_count(test_count)
+    async def create(self):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_total_uses_estimate_for_large_tables(fake_redis):
+    repository = AsyncMock()
+    repository.estimate_total_count.return_value = COUNT_ESTIMATE_THRESHOLD
+
+    assert await unfiltered_total(repository, test_count) == (
+        COUNT_ESTIMATE_THRESHOLD,
+        True,
+    )
+    repository.get_total_count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_total_caches_exact_count(fake_redis):
+    repository = AsyncMock()
+    repository.estimate_total_count.return_value = None
+    repository.get_total_count.return_value = 42
+
+    assert await unfiltered_total(repository, test_count) == (42, False)
+    assert await unfiltered_total(repository, test_count) == (42, False)
+    repository.get_total_count.assert_awaited_once()
+
+    await CountedService().create()
+
+    assert test_count.key() not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_filter_cache_key_ignores_filter_order(fake_redis):
+    facets = FilterCache("test_facets", ttl=60)
+    loader = AsyncMock(return_value=b'{"total":1}')
+
+    first = await facets.get_or_load({"category": "A", "in_stock": True}, loader)
+    second = await facets.get_or_load({"in_stock": True, "category": "A"}, loader)
+    other = await facets.get_or_load({"category": "B"}, loader)
+
+    assert first == second == other == b'{"total":1}'
+    assert loader.await_count == 2
@@ -0,0 +1,102 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+import redis_client
+from cache import EntityCache
+from redis.exceptions import ConnectionError
+from redis_client import breaker, get_redis_client, redis_call
+from schemas import ProductResponse
+
+flaky_cache = EntityCache("test_flaky", ProductResponse, ttl=60)
+
+
+@pytest.fixture(autouse=True)
+def reset_breaker():
+    breaker.record_success()
+    yield
+    breaker.record_success()
+
+
+def failing_client():
+    client = MagicMock()
+    client.ping = AsyncMock(side_effect=ConnectionError("refused"))
+    client.close = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_connect_failure_opens_circuit():
+    create_client = MagicMock(side_effect=failing_client)
+
+    with (
+        patch("redis_client._redis_client", None),
+        patch("redis_client._create_client", create_client),
+        patch("redis_client._ensure_reconnect"),
+    ):
+        assert await get_redis_client() is None
+        assert await get_redis_client() is None
+
+    assert breaker.is_open
+    # Пока цепь разомкнута, подключение на каждом запросе не повторяется
+    create_client.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_operation_errors_fall_back_to_loader():
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=ConnectionError("reset"))
+    client.setex = AsyncMock(side_effect=ConnectionError("reset"))
+    product_id = uuid4()
+    loader = AsyncMock(
+        return_value=ProductResponse(
+            id=product_id,
+            name="Flaky",
+            price=1.0,
+            category="Cache",
+            created_at="2026-01-01T00:00:00",
+            updated_at="2026-01-01T00:00:00",
+        )
+    )
+
+    with (
+        patch("redis_client.get_redis_client", AsyncMock(return_value=client)),
+        patch("redis_client._ensure_reconnect"),
+    ):
+        result = await flaky_cache.get_or_load(product_id, loader)
+
+    assert result.id == product_id
+    loader.assert_called_once()
+    assert breaker.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_threshold():
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=ConnectionError("reset"))
+
+    with (
+        patch("redis_client.get_redis_client", AsyncMock(return_value=client)),
+        patch("redis_client._ensure_reconnect"),
+    ):
+        for _ in range(breaker.failure_threshold):
+            assert await redis_call(lambda c: c.get("key")) is None
+
+    assert breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_background_reconnect_closes_circuit():
+    client = MagicMock()
+    client.ping = AsyncMock(return_value=True)
+    breaker.open()
+
+    with (
+        patch("redis_client._redis_client", None),
+        patch("redis_client._create_client", return_value=client),
+        patch("redis_client.REDIS_RETRY_INTERVAL", 0),
+    ):
+        await redis_client._reconnect()
+        assert await get_redis_client() is client
+
+    assert not breaker.is_open
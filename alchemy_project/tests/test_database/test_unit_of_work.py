@@ -0,0 +1,84 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from address_repository import AddressRepository
+from cache import EntityCache, invalidates
+from schemas import AddressCreate, ProductResponse, UserCreate, UserUpdate
+from sqlalchemy import event
+from unit_of_work import UnitOfWork, active_unit_of_work
+from user_repository import UserRepository
+
+
+def address_data(user_id) -> AddressCreate:
+    return AddressCreate(
+        user_id=user_id,
+        street="street",
+        city="city",
+        state="state",
+        zip_code="zip_code",
+        country="country",
+    )
+
+
+@pytest.mark.asyncio
+async def test_single_commit_for_several_repositories(session):
+    commits = []
+    engine = session.bind.sync_engine
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        async with UnitOfWork(session):
+            user = await UserRepository(session).create(
+                UserCreate(email="uow@example.com", username="uow_user")
+            )
+            address, _ = await AddressRepository(session).create(address_data(user.id))
+            await UserRepository(session).update(
+                user.id, UserUpdate(description="with address")
+            )
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert len(commits) == 1
+    assert (await AddressRepository(session).get_by_id(address.id)).user_id == user.id
+
+
+@pytest.mark.asyncio
+async def test_rollback_on_error(session):
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(session):
+            user = await UserRepository(session).create(
+                UserCreate(email="uow_fail@example.com", username="uow_fail")
+            )
+            raise RuntimeError("order failed")
+
+    assert await UserRepository(session).get_by_id(user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_joins_outer(session):
+    async with UnitOfWork(session) as outer:
+        async with UnitOfWork(session) as inner:
+            assert inner is outer
+        assert active_unit_of_work(session) is outer
+
+    assert active_unit_of_work(session) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_again_after_commit(session):
+    cache = EntityCache("test_uow", ProductResponse, ttl=60)
+
+    class Service:
+        @invalidates(cache)
+        async def update(self, entity_id):
+            return True
+
+    with patch.object(cache, "invalidate", AsyncMock()) as invalidate:
+        async with UnitOfWork(session):
+            await Service().update("id")
+            assert invalidate.call_count == 1
+
+    assert invalidate.call_count == 2
@@ -0,0 +1,106 @@
+import pytest
+from address_repository import AddressRepository
+from schemas import AddressCreate, AddressUpdate, UserCreate
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from tables import Address
+from user_repository import UserRepository
+
+
+def address_data(user_id, street: str, is_primary: bool = False) -> AddressCreate:
+    return AddressCreate(
+        user_id=user_id,
+        street=street,
+        city="Москва",
+        state="Москва",
+        zip_code="101000",
+        country="Россия",
+        is_primary=is_primary,
+    )
+
+
+async def primary_count(repository: AddressRepository, user_id) -> int:
+    return await repository.session.scalar(
+        select(func.count())
+        .select_from(Address)
+        .where(Address.user_id == user_id, Address.is_primary)
+    )
+
+
+class TestAddressRepository:
+    """Тесты для репозитория адресов"""
+
+    @pytest.mark.asyncio
+    async def test_create_primary_switches_flag(
+        self, address_repository: AddressRepository, user_repository: UserRepository
+    ):
+        """Новый основной адрес снимает флаг со старого"""
+        user = await user_repository.create(
+            UserCreate(email="primary@example.com", username="primary_user")
+        )
+        first, _ = await address_repository.create(
+            address_data(user.id, "Первая", True)
+        )
+        second, demoted_ids = await address_repository.create(
+            address_data(user.id, "Вторая", True)
+        )
+
+        primary = await address_repository.get_primary_by_user_id(user.id)
+
+        assert primary.id == second.id
+        assert demoted_ids == [first.id]
+        assert await primary_count(address_repository, user.id) == 1
+        await address_repository.session.refresh(first)
+        assert first.is_primary is False
+
+    @pytest.mark.asyncio
+    async def test_update_primary_switches_flag(
+        self, address_repository: AddressRepository, user_repository: UserRepository
+    ):
+        """Перевод существующего адреса в основные"""
+        user = await user_repository.create(
+            UserCreate(email="switch@example.com", username="switch_user")
+        )
+        first, _ = await address_repository.create(
+            address_data(user.id, "Первая", True)
+        )
+        second, demoted_ids = await address_repository.create(
+            address_data(user.id, "Вторая")
+        )
+        assert demoted_ids == []
+
+        updated, demoted_ids = await address_repository.update(
+            second.id, AddressUpdate(is_primary=True)
+        )
+
+        assert updated.is_primary is True
+        assert demoted_ids == [first.id]
+        assert (await address_repository.get_primary_by_user_id(user.id)).id == second.id
+        assert await primary_count(address_repository, user.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_second_primary_rejected_by_index(
+        self, address_repository: AddressRepository, user_repository: UserRepository
+    ):
+        """Частичный уникальный индекс не дает записать два основных адреса"""
+        user = await user_repository.create(
+            UserCreate(email="unique@example.com", username="unique_user")
+        )
+        await address_repository.create(address_data(user.id, "Первая", True))
+
+        session = address_repository.session
+        session.add(Address(**address_data(user.id, "Вторая", True).model_dump()))
+        with pytest.raises(IntegrityError):
+            await session.commit()
+        await session.rollback()
+
+    @pytest.mark.asyncio
+    async def test_get_primary_not_set(
+        self, address_repository: AddressRepository, user_repository: UserRepository
+    ):
+        user = await user_repository.create(
+            UserCreate(email="no_primary@example.com", username="no_primary")
+        )
+        await address_repository.create(address_data(user.id, "Обычная"))
+
+        assert await address_repository.get_primary_by_user_id(user.id) is None
@@ -1,15 +1,19 @@
 import os
 import sys
+from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
 
 import pytest
+from litestar.exceptions import ValidationException
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from dto import OrderRow, to_structs
 from order_repository import OrderRepository
 from product_repository import ProductRepository
-from schemas import (OrderCreate, OrderItemCreate, OrderUpdate, ProductCreate,
-                     UserCreate)
+from schemas import (OrderCreate, OrderItemCreate, OrderResponse, OrderUpdate,
+                     ProductCreate, UserCreate)
+from sqlalchemy import event
 from user_repository import UserRepository
 
 
@@ -78,6 +82,58 @@ class TestOrderRepository:
         assert order.delivery_address_id == fake_address_id
         assert order.total_amount == 54000.0
 
+    @pytest.mark.asyncio
+    async def test_create_order_unknown_product(
+        self,
+        order_repository: OrderRepository,
+        user_repository: UserRepository,
+        product_repository: ProductRepository,
+    ):
+        user = await user_repository.create(
+            UserCreate(
+                email="unknown_product@example.com",
+                username="unknown_product_user",
+                description="For unknown product test",
+            )
+        )
+
+        product = await product_repository.create(
+            ProductCreate(
+                name="Монитор",
+                description="Существующий товар",
+                price=15000.0,
+                category="Электроника",
+                in_stock=True,
+            )
+        )
+
+        missing_id = uuid4()
+        with pytest.raises(ValidationException) as exc_info:
+            await order_repository.create(
+                OrderCreate(
+                    user_id=user.id,
+                    delivery_address_id=uuid4(),
+                    status="pending",
+                    items=[
+                        OrderItemCreate(
+                            product_id=product.id,
+                            quantity=1,
+                            unit_price=product.price,
+                            order_id=uuid4(),
+                        ),
+                        OrderItemCreate(
+                            product_id=missing_id,
+                            quantity=1,
+                            unit_price=1.0,
+                            order_id=uuid4(),
+                        ),
+                    ],
+                )
+            )
+
+        assert str(missing_id) in exc_info.value.detail
+        assert str(product.id) not in exc_info.value.detail
+
     @pytest.mark.asyncio
     async def test_get_order_by_id(
         self,
@@ -231,6 +287,74 @@ class TestOrderRepository:
             assert order.status == "pending"
             assert order.delivery_address_id == fake_address_id
 
+    @pytest.mark.asyncio
+    async def test_get_by_user_id_include_relations(
+        self,
+        order_repository: OrderRepository,
+        user_repository: UserRepository,
+        product_repository: ProductRepository,
+    ):
+        user = await user_repository.create(
+            UserCreate(email="include_orders@example.com", username="include_user")
+        )
+        product = await product_repository.create(
+            ProductCreate(name="Кабель", price=500.0, category="Аксессуары")
+        )
+        for _ in range(3):
+            await order_repository.create(
+                OrderCreate(
+                    user_id=user.id,
+                    delivery_address_id=uuid4(),
+                    items=[
+                        OrderItemCreate(
+                            product_id=product.id,
+                            quantity=2,
+                            unit_price=product.price,
+                            order_id=uuid4(),
+                        )
+                    ],
+                )
+            )
+        session = order_repository.session
+        session.expunge_all()
+
+        plain = await order_repository.get_by_user_id(user.id)
+        assert all(OrderResponse.model_validate(o).items == [] for o in plain)
+        session.expunge_all()
+
+        statements = []
+
+        def count_statements(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            orders = await order_repository.get_by_user_id(
+                user.id, include={"items", "product"}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+
+        responses = [OrderResponse.model_validate(order) for order in orders]
+        assert len(responses) == 3
+        assert all(r.items[0].product.id == product.id for r in responses)
+        assert all(r.address is None for r in responses)
+        # Заказы, позиции и товары - по одному запросу на всю страницу
+        assert len(statements) == 3
+
+        # Без include=product товар в позициях пустой и не догружается лениво
+        session.expunge_all()
+        orders = await order_repository.get_by_user_id(user.id, include={"items"})
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            rows = to_structs(orders, OrderRow)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+        assert all(row.items[0].product is None for row in rows)
+        assert statements == []
+
     @pytest.mark.asyncio
     async def test_delete_order(
         self,
@@ -327,3 +451,76 @@ class TestOrderRepository:
         assert updated_order is not None
         assert updated_order.id == order.id
         assert updated_order.status == "shipped"
+
+    @pytest.mark.asyncio
+    async def test_stream_by_filter(
+        self,
+        order_repository: OrderRepository,
+        user_repository: UserRepository,
+        product_repository: ProductRepository,
+    ):
+        user = await user_repository.create(
+            UserCreate(
+                email="stream_orders@example.com",
+                username="stream_user",
+                description="For stream test",
+            )
+        )
+
+        product = await product_repository.create(
+            ProductCreate(
+                name="Кабель",
+                description="USB кабель",
+                price=500.0,
+                category="Аксессуары",
+                in_stock=True,
+            )
+        )
+
+        fake_address_id = uuid4()
+        for _ in range(5):
+            await order_repository.create(
+                OrderCreate(
+                    user_id=user.id,
+                    delivery_address_id=fake_address_id,
+                    status="pending",
+                    items=[
+                        OrderItemCreate(
+                            product_id=product.id,
+                            quantity=1,
+                            unit_price=product.price,
+                            order_id=fake_address_id,
+                        )
+                    ],
+                )
+            )
+
+        batches = [
+            batch
+            async for batch in order_repository.stream_by_filter(
+                batch_size=2, user_id=user.id
+            )
+        ]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert all(order.user_id == user.id for batch in batches for order in batch)
+
+    @pytest.mark.asyncio
+    async def test_stream_by_filter_lifts_timeouts_on_postgresql(self):
+        async def no_partitions():
+            return
+            yield
+
+        session = AsyncMock()
+        session.bind = MagicMock()
+        session.bind.dialect.name = "postgresql"
+        session.stream_scalars.return_value.partitions = no_partitions
+
+        batches = [batch async for batch in OrderRepository(session).stream_by_filter()]
+
+        statements = [str(call.args[0]) for call in session.execute.await_args_list]
+        assert batches == []
+        assert statements == [
+            "SET LOCAL idle_in_transaction_session_timeout = 0",
+            "SET LOCAL statement_timeout = 60000",
+        ]
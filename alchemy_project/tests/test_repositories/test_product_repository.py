@@ -1,5 +1,6 @@
 import os
 import sys
+from uuid import uuid4
 
 import pytest
 
@@ -7,6 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from product_repository import ProductRepository
 from schemas import ProductCreate, ProductUpdate
+from sqlalchemy.dialects import postgresql
 
 
 class TestProductRepository:
@@ -191,6 +193,168 @@ class TestProductRepository:
 
         assert count >= 1
 
+    @pytest.mark.asyncio
+    async def test_get_total_count_matches_filter(
+        self, product_repository: ProductRepository
+    ):
+        for price in (10.0, 20.0, 30.0):
+            await product_repository.create(
+                ProductCreate(
+                    name=f"Продукт за {price}",
+                    description="Тестовый продукт",
+                    price=price,
+                    category="Подсчет по цене",
+                    in_stock=True,
+                )
+            )
+
+        filters = {"category": "Подсчет по цене", "price_min": 15.0, "price_max": 30.0}
+        count = await product_repository.get_total_count(**filters)
+        products = await product_repository.get_by_filter(count=100, **filters)
+
+        assert count == 2
+        assert count == len(products)
+
+    @pytest.mark.asyncio
+    async def test_get_by_filter_with_total(
+        self, product_repository: ProductRepository
+    ):
+        for i in range(5):
+            await product_repository.create(
+                ProductCreate(name=f"Оконный {i}", price=10.0, category="Окно")
+            )
+
+        products, total = await product_repository.get_by_filter_with_total(
+            count=2, page=2, category="Окно"
+        )
+        expected = await product_repository.get_by_filter(
+            count=2, page=2, category="Окно"
+        )
+
+        assert total == 5
+        assert [p.id for p in products] == [p.id for p in expected]
+
+        products, total = await product_repository.get_by_filter_with_total(
+            count=2, page=10, category="Окно"
+        )
+        assert products == []
+        assert total is None
+
+    @pytest.mark.asyncio
+    async def test_bulk_create(self, product_repository: ProductRepository):
+        ids = await product_repository.bulk_create(
+            [
+                ProductCreate(
+                    name=f"Пакетный продукт {i}",
+                    price=10.0 + i,
+                    category="Пакетная загрузка",
+                )
+                for i in range(1500)
+            ]
+        )
+
+        assert len(ids) == 1500
+        assert len(set(ids)) == 1500
+        count = await product_repository.get_total_count(category="Пакетная загрузка")
+        assert count == 1500
+
+        product = await product_repository.get_by_id(ids[-1])
+        assert product.name == "Пакетный продукт 1499"
+        assert product.in_stock == True
+
+    @pytest.mark.asyncio
+    async def test_get_by_ids(self, product_repository: ProductRepository):
+        ids = await product_repository.bulk_create(
+            [
+                ProductCreate(
+                    name=f"Продукт корзины {i}", price=5.0, category="Корзина"
+                )
+                for i in range(3)
+            ]
+        )
+
+        products = await product_repository.get_by_ids([ids[0], ids[2], uuid4()])
+
+        assert {product.id for product in products} == {ids[0], ids[2]}
+        assert await product_repository.get_by_ids([]) == []
+
+    @pytest.mark.asyncio
+    async def test_get_names(self, product_repository: ProductRepository):
+        names = [f"Продукт подсказки {i}" for i in range(3)]
+        ids = await product_repository.bulk_create(
+            [
+                ProductCreate(name=name, price=5.0, category="Подсказки")
+                for name in names
+            ]
+        )
+
+        assert set(zip(ids, names)) <= set(await product_repository.get_names())
+
+    @pytest.mark.asyncio
+    async def test_search(self, product_repository: ProductRepository):
+        await product_repository.bulk_create(
+            [
+                ProductCreate(name="Electric kettle", price=30.0, category="Kitchen"),
+                ProductCreate(
+                    name="Thermos",
+                    description="Replaces a kettle on a hike",
+                    price=15.0,
+                    category="Outdoor",
+                ),
+                ProductCreate(name="Kettle 100%", price=5.0, category="Kitchen"),
+            ]
+        )
+
+        found = await product_repository.search("KETTLE", count=10)
+        assert {product.name for product in found} == {
+            "Electric kettle",
+            "Thermos",
+            "Kettle 100%",
+        }
+
+        found = await product_repository.search(
+            "kettle", category="Kitchen", price_min=10
+        )
+        assert [product.name for product in found] == ["Electric kettle"]
+
+        found = await product_repository.search("100%")
+        assert [product.name for product in found] == ["Kettle 100%"]
+
+    @pytest.mark.asyncio
+    async def test_get_facet_counts(self, product_repository: ProductRepository):
+        await product_repository.bulk_create(
+            [
+                ProductCreate(name="Фасет 1", price=5.0, category="Фасеты"),
+                ProductCreate(name="Фасет 2", price=9.0, category="Фасеты"),
+                ProductCreate(
+                    name="Фасет 3", price=75.0, category="Фасеты", in_stock=False
+                ),
+                ProductCreate(name="Фасет 4", price=2000.0, category="Фасеты"),
+            ]
+        )
+
+        counts = await product_repository.get_facet_counts(category="Фасеты")
+        assert sorted(counts) == [("Фасеты", 0, 2), ("Фасеты", 2, 1), ("Фасеты", 5, 1)]
+
+        counts = await product_repository.get_facet_counts(
+            category="Фасеты", in_stock=True, price_max=100
+        )
+        assert counts == [("Фасеты", 0, 2)]
+
+    def test_facet_query_postgresql(self, product_repository: ProductRepository):
+        query = product_repository._facet_query(in_stock=True)
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "GROUP BY products.category, bucket" in sql
+
+    def test_search_query_postgresql(self, product_repository: ProductRepository):
+        query = product_repository._search_query("kettle", postgresql=True)
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "websearch_to_tsquery('russian'" in sql
+        assert "<%% products.name" in sql
+        assert "ORDER BY ts_rank(" in sql
+
     @pytest.mark.asyncio
     async def test_update_product_in_stock(self, product_repository: ProductRepository):
         product = await product_repository.create(
@@ -1,5 +1,10 @@
+from datetime import datetime
+
 import pytest
+from litestar.exceptions import ValidationException
+from pagination import next_cursor
 from schemas import UserCreate, UserUpdate
+from sqlalchemy import event
 from tables import User
 from user_repository import UserRepository
 
@@ -124,6 +129,42 @@ class TestUserRepository:
 
         assert isinstance(users, list)
 
+    @pytest.mark.asyncio
+    async def test_get_by_filter_cursor_pagination(
+        self, user_repository: UserRepository
+    ):
+        """Тест постраничного обхода по курсору без пропусков и повторов"""
+        created_ids = set()
+        for i in range(5):
+            user = await user_repository.create(
+                UserCreate(
+                    email=f"cursor{i}@example.com",
+                    username=f"cursor_user{i}",
+                    description="Cursor pagination user",
+                )
+            )
+            created_ids.add(user.id)
+
+        seen_ids = []
+        cursor = None
+        while True:
+            users = await user_repository.get_by_filter(
+                count=2, cursor=cursor, description="Cursor pagination user"
+            )
+            seen_ids.extend(user.id for user in users)
+            cursor = next_cursor(users, 2)
+            if cursor is None:
+                break
+
+        assert len(seen_ids) == len(created_ids)
+        assert set(seen_ids) == created_ids
+
+    @pytest.mark.asyncio
+    async def test_get_by_filter_invalid_cursor(self, user_repository: UserRepository):
+        """Тест что испорченный курсор дает ошибку валидации"""
+        with pytest.raises(ValidationException):
+            await user_repository.get_by_filter(cursor="not-a-cursor")
+
     @pytest.mark.asyncio
     async def test_get_total_count(self, user_repository: UserRepository):
         """Тест получения общего количества пользователей"""
@@ -164,6 +205,27 @@ class TestUserRepository:
 
         assert filtered_count >= 1
 
+    @pytest.mark.asyncio
+    async def test_get_total_count_filter_is_applied(
+        self, user_repository: UserRepository
+    ):
+        """Тест что фильтр учитывается при подсчете, а не игнорируется"""
+        await user_repository.create(
+            UserCreate(
+                email="only_one_count@example.com",
+                username="only_one",
+                description="Single user for exact count",
+            )
+        )
+
+        filtered_count = await user_repository.get_total_count(
+            email="only_one_count@example.com"
+        )
+        total_count = await user_repository.get_total_count()
+
+        assert filtered_count == 1
+        assert total_count > filtered_count
+
     @pytest.mark.asyncio
     async def test_update_user_success(self, user_repository: UserRepository):
         """Тест успешного обновления пользователя"""
@@ -199,6 +261,31 @@ class TestUserRepository:
         assert updated_user.username == "partial_user"
         assert updated_user.description == "Original"
 
+    @pytest.mark.asyncio
+    async def test_update_user_single_statement(self, user_repository: UserRepository):
+        """Обновление - один UPDATE ... RETURNING, updated_at по часам приложения"""
+        created_user = await user_repository.create(
+            UserCreate(email="returning@example.com", username="returning_user")
+        )
+        statements = []
+
+        def count_statements(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = user_repository.session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            updated_user = await user_repository.update(
+                created_user.id, UserUpdate(username="returning_renamed")
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+
+        assert updated_user.username == "returning_renamed"
+        assert created_user.created_at <= updated_user.updated_at <= datetime.now()
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE users")
+
     @pytest.mark.asyncio
     async def test_update_user_not_found(self, user_repository: UserRepository):
         """Тест обновления несуществующего пользователя"""
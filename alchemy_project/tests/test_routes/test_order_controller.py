@@ -5,7 +5,7 @@ from uuid import UUID
 import pytest
 from litestar.di import Provide
 from litestar.status_codes import (HTTP_200_OK, HTTP_201_CREATED,
-                                   HTTP_204_NO_CONTENT)
+                                   HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST)
 from litestar.testing import create_test_client
 from order_controller import OrderController
 from order_service import OrderService
@@ -65,7 +65,9 @@ class MockOrderService(OrderService):
     async def get_by_id(self, order_id: UUID, include_relations: bool = True):
         return self._mock_get_by_id(order_id, include_relations)
 
-    async def get_by_user_id(self, user_id: UUID, count: int = 10, page: int = 1):
+    async def get_by_user_id(
+        self, user_id: UUID, count: int = 10, page: int = 1, cursor=None, include=()
+    ):
         return self._mock_get_by_user_id(user_id, count, page)
 
     async def get_by_filter(self, count: int = 10, page: int = 1, **kwargs):
@@ -203,6 +205,28 @@ async def test_get_all_orders_with_filters(order_response: OrderResponse):
         assert data["filters"]["max_amount"] == 1000.0
 
 
+@pytest.mark.asyncio
+async def test_get_all_orders_include(order_response: OrderResponse):
+    mock_service = MockOrderService()
+
+    mock_service._mock_get_by_filter.return_value = [order_response]
+    mock_service._mock_get_total_count.return_value = 1
+
+    with create_test_client(
+        route_handlers=[OrderController],
+        dependencies={
+            "order_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get("/orders/get_all_orders?include=product,address")
+        assert response.status_code == HTTP_200_OK
+        _, kwargs = mock_service._mock_get_by_filter.call_args
+        assert kwargs["include"] == {"product", "address"}
+
+        response = client.get("/orders/get_all_orders?include=user")
+        assert response.status_code == HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.asyncio
 async def test_create_order(order_create: OrderCreate, order_response: OrderResponse):
     mock_service = MockOrderService()
@@ -7,9 +7,11 @@ from litestar.status_codes import (HTTP_200_OK, HTTP_201_CREATED,
                                    HTTP_204_NO_CONTENT)
 from litestar.testing import create_test_client
 from polyfactory.factories.pydantic_factory import ModelFactory
+from dto import ProductSuggestion
 from product_controller import ProductController
 from product_service import ProductService
-from schemas import ProductCreate, ProductResponse, ProductUpdate
+from schemas import (ProductBulkResponse, ProductCreate, ProductResponse,
+                     ProductUpdate)
 
 
 class ProductCreateFactory(ModelFactory[ProductCreate]):
@@ -44,9 +46,15 @@ class MockProductService(ProductService):
         super().__init__(repository=Mock())
 
         self._mock_get_by_id = Mock()
+        self._mock_get_by_ids = Mock()
+        self._mock_search = Mock()
+        self._mock_suggest = Mock()
+        self._mock_get_facets = Mock()
         self._mock_get_by_filter = Mock()
         self._mock_get_total_count = Mock()
+        self._mock_get_by_filter_with_total = Mock()
         self._mock_create = Mock()
+        self._mock_bulk_create = Mock()
         self._mock_update = Mock()
         self._mock_delete = Mock()
 
@@ -54,16 +62,41 @@ class MockProductService(ProductService):
         result = self._mock_get_by_id(product_id)
         return result
 
+    async def get_json_by_id(self, product_id: UUID):
+        result = self._mock_get_by_id(product_id)
+        return result.model_dump_json().encode() if result else None
+
+    async def get_by_ids(self, product_ids: list):
+        return self._mock_get_by_ids(product_ids)
+
+    async def search(self, query: str, count: int = 10, page: int = 1, **kwargs):
+        return self._mock_search(query, count, page, **kwargs)
+
+    async def get_facets_json(self, **kwargs):
+        return self._mock_get_facets(**kwargs)
+
+    def suggest(self, prefix: str, limit: int = 10):
+        return self._mock_suggest(prefix, limit)
+
     async def get_by_filter(self, count: int = 10, page: int = 1, **kwargs):
         result = self._mock_get_by_filter(count, page, **kwargs)
         return result
 
+    async def get_by_filter_with_total(self, count: int = 10, page: int = 1, **kwargs):
+        return self._mock_get_by_filter_with_total(count, page, **kwargs)
+
     async def get_total_count(self, **kwargs):
         return self._mock_get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs):
+        return self._mock_get_total_count(**kwargs), False
+
     async def create(self, product_data: ProductCreate):
         return self._mock_create(product_data)
 
+    async def bulk_create(self, rows: list):
+        return self._mock_bulk_create(rows)
+
     async def update(self, product_id: UUID, product_data: ProductUpdate):
         return self._mock_update(product_id, product_data)
 
@@ -163,6 +196,29 @@ async def test_get_all_products_with_filters(product_response: ProductResponse):
         assert data["filters"]["price_max"] == 100.0
 
 
+@pytest.mark.asyncio
+async def test_get_all_products_next_cursor(product_response: ProductResponse):
+    mock_service = MockProductService()
+
+    mock_service._mock_get_by_filter.return_value = [product_response]
+    mock_service._mock_get_total_count.return_value = 2
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get("/products/get_all_products?count=1")
+        assert response.status_code == HTTP_200_OK
+        next_cursor = response.json()["next_cursor"]
+        assert next_cursor is not None
+
+        client.get(f"/products/get_all_products?count=1&cursor={next_cursor}")
+        _, kwargs = mock_service._mock_get_by_filter.call_args
+        assert kwargs["cursor"] == next_cursor
+
+
 @pytest.mark.asyncio
 async def test_create_product(
     product_create: ProductCreate, product_response: ProductResponse
@@ -184,6 +240,32 @@ async def test_create_product(
         assert response.json()["name"] == product_response.name
 
 
+@pytest.mark.asyncio
+async def test_bulk_create_products(product_create: ProductCreate):
+    from uuid import uuid4
+
+    mock_service = MockProductService()
+
+    created_id = uuid4()
+    mock_service._mock_bulk_create.return_value = ProductBulkResponse(
+        created_count=1, ids=[created_id], errors=[]
+    )
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.post(
+            "/products/bulk", json=[product_create.model_dump(), {"name": "broken"}]
+        )
+        assert response.status_code == HTTP_201_CREATED
+        assert response.json()["ids"] == [str(created_id)]
+        mock_service._mock_bulk_create.assert_called_once()
+        assert len(mock_service._mock_bulk_create.call_args.args[0]) == 2
+
+
 @pytest.mark.asyncio
 async def test_update_product(
     product_response: ProductResponse, product_update: ProductUpdate
@@ -273,3 +355,126 @@ async def test_delete_product_not_found():
     ) as client:
         response = client.delete(f"/products/delete_product/{uuid4()}")
         assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_all_products_count_modes(product_response: ProductResponse):
+    mock_service = MockProductService()
+
+    mock_service._mock_get_by_filter.return_value = [product_response]
+    mock_service._mock_get_by_filter_with_total.return_value = ([product_response], 7)
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get("/products/get_all_products?count_mode=window")
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["total_count"] == 7
+
+        response = client.get("/products/get_all_products?with_total=false")
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["total_count"] is None
+
+    mock_service._mock_get_total_count.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_products_batch(product_response: ProductResponse):
+    from uuid import uuid4
+
+    mock_service = MockProductService()
+    mock_service._mock_get_by_ids.return_value = [product_response]
+    unknown_id = uuid4()
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get(
+            "/products/batch",
+            params={"ids": [str(product_response.id), str(unknown_id)]},
+        )
+        assert response.status_code == HTTP_200_OK
+        assert [item["id"] for item in response.json()] == [str(product_response.id)]
+
+        response = client.get("/products/batch")
+        assert response.status_code == 400
+
+    mock_service._mock_get_by_ids.assert_called_once_with(
+        [product_response.id, unknown_id]
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_products(product_response: ProductResponse):
+    mock_service = MockProductService()
+    mock_service._mock_search.return_value = [product_response]
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get(
+            "/products/search", params={"q": "phone", "in_stock": "true", "count": 5}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.json()["products"][0]["id"] == str(product_response.id)
+
+        response = client.get("/products/search", params={"q": ""})
+        assert response.status_code == 400
+
+    mock_service._mock_search.assert_called_once_with("phone", 5, 1, in_stock=True)
+
+
+@pytest.mark.asyncio
+async def test_suggest_products(product_response: ProductResponse):
+    mock_service = MockProductService()
+    mock_service._mock_suggest.return_value = [
+        ProductSuggestion(id=product_response.id, name=product_response.name)
+    ]
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get("/products/suggest", params={"prefix": "ph", "limit": 5})
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == [
+            {"id": str(product_response.id), "name": product_response.name}
+        ]
+
+        response = client.get("/products/suggest", params={"prefix": ""})
+        assert response.status_code == 400
+
+    mock_service._mock_suggest.assert_called_once_with("ph", 5)
+
+
+@pytest.mark.asyncio
+async def test_get_product_facets():
+    mock_service = MockProductService()
+    mock_service._mock_get_facets.return_value = b'{"total":0}'
+
+    with create_test_client(
+        route_handlers=[ProductController],
+        dependencies={
+            "product_service": Provide(lambda: mock_service, sync_to_thread=False)
+        },
+    ) as client:
+        response = client.get(
+            "/products/facets", params={"category": "Books", "price_max": 50}
+        )
+        assert response.status_code == HTTP_200_OK
+        assert response.json() == {"total": 0}
+
+    mock_service._mock_get_facets.assert_called_once_with(
+        category="Books", price_max=50.0
+    )
@@ -2,6 +2,7 @@ from unittest.mock import Mock
 from uuid import UUID
 
 import pytest
+from dto import UserRow
 from litestar.di import Provide
 from litestar.status_codes import (HTTP_200_OK, HTTP_201_CREATED,
                                    HTTP_204_NO_CONTENT)
@@ -53,12 +54,19 @@ class MockUserService(UserService):
     async def get_by_id(self, user_id: UUID):
         return self._mock_get_by_id(user_id)
 
+    async def get_json_by_id(self, user_id: UUID):
+        result = self._mock_get_by_id(user_id)
+        return result.model_dump_json().encode() if result else None
+
     async def get_by_filter(self, count: int = 10, page: int = 1, **kwargs):
         return self._mock_get_by_filter(count, page, **kwargs)
 
     async def get_total_count(self, **kwargs):
         return self._mock_get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs):
+        return self._mock_get_total_count(**kwargs), False
+
     async def create(self, user_data: UserCreate):
         return self._mock_create(user_data)
 
@@ -72,12 +80,7 @@ class MockUserService(UserService):
 @pytest.mark.asyncio
 async def test_get_user_by_id(user_response: UserResponse):
     mock_service = MockUserService()
-
-    user_obj = Mock()
-    for key, value in user_response.model_dump().items():
-        setattr(user_obj, key, value)
-
-    mock_service._mock_get_by_id.return_value = user_obj
+    mock_service._mock_get_by_id.return_value = user_response
 
     with create_test_client(
         route_handlers=[UserController],
@@ -112,9 +115,7 @@ async def test_get_user_by_id_not_found():
 async def test_get_all_users(user_response: UserResponse):
     mock_service = MockUserService()
 
-    user_obj = Mock()
-    for key, value in user_response.model_dump().items():
-        setattr(user_obj, key, value)
+    user_obj = UserRow(**user_response.model_dump())
 
     mock_service._mock_get_by_filter.return_value = [user_obj]
     mock_service._mock_get_total_count.return_value = 1
@@ -137,9 +138,7 @@ async def test_get_all_users(user_response: UserResponse):
 async def test_get_all_users_default_pagination(user_response: UserResponse):
     mock_service = MockUserService()
 
-    user_obj = Mock()
-    for key, value in user_response.model_dump().items():
-        setattr(user_obj, key, value)
+    user_obj = UserRow(**user_response.model_dump())
 
     def verify_params(count, page, **kwargs):
         assert count == 10
@@ -225,12 +224,7 @@ async def test_update_user_not_found(user_update: UserUpdate):
 @pytest.mark.asyncio
 async def test_delete_user(user_response: UserResponse):
     mock_service = MockUserService()
-
-    user_obj = Mock()
-    for key, value in user_response.model_dump().items():
-        setattr(user_obj, key, value)
-
-    mock_service._mock_get_by_id.return_value = user_obj
+    mock_service._mock_get_by_id.return_value = user_response
     mock_service._mock_delete.return_value = True
 
     with create_test_client(
@@ -0,0 +1,122 @@
+import asyncio
+import gc
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from batch_loader import BatchLoader, load_by_id, repository_loader
+from product_repository import ProductRepository
+from schemas import ProductCreate, ProductResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from unit_of_work import UnitOfWork
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_batch():
+    load_many = AsyncMock(side_effect=lambda ids: {key: key * 10 for key in ids if key})
+    loader = BatchLoader(load_many, window=0.01)
+
+    results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 1, 0, 3]))
+
+    assert results == [10, 20, 10, None, 30]
+    load_many.assert_awaited_once_with([1, 2, 0, 3])
+    assert loader.stats() == {"batches": 1, "coalesced": 1}
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting():
+    load_many = AsyncMock(side_effect=lambda ids: {key: key for key in ids})
+    loader = BatchLoader(load_many, window=60, max_size=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load(1), loader.load(2)), timeout=1
+    )
+
+    assert results == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_error_is_shared_by_batch():
+    loader = BatchLoader(AsyncMock(side_effect=RuntimeError("db down")), window=0)
+
+    results = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_no_unretrieved_error():
+    release = asyncio.Event()
+
+    async def load_many(ids):
+        await release.wait()
+        raise RuntimeError("db down")
+
+    loader = BatchLoader(load_many, window=0)
+    errors = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    try:
+        waiter = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*loader._tasks)
+        del waiter
+        gc.collect()
+    finally:
+        loop.set_exception_handler(None)
+
+    assert errors == []
+
+
+@pytest.mark.asyncio
+async def test_key_of_cancelled_waiter_is_loaded_again():
+    load_many = AsyncMock(side_effect=lambda ids: {key: key for key in ids})
+    loader = BatchLoader(load_many, window=0.01)
+
+    waiter = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    assert await loader.load(1) == 1
+    load_many.assert_awaited_once_with([1])
+
+
+@pytest.mark.asyncio
+async def test_repository_loader_uses_own_session(engine, session):
+    repository = ProductRepository(session)
+    product = await repository.create(
+        ProductCreate(name="Пачка", price=1.0, category="Загрузчик")
+    )
+    loader = repository_loader(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        ProductRepository,
+        ProductResponse,
+    )
+
+    found, missing = await asyncio.gather(
+        load_by_id(loader, repository, product.id),
+        load_by_id(loader, repository, uuid4()),
+    )
+
+    assert isinstance(found, ProductResponse)
+    assert found.id == product.id
+    assert missing is None
+    assert loader.batches == 1
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_reads_through_own_session(session):
+    repository = AsyncMock()
+    repository.session = session
+    loader = BatchLoader(AsyncMock())
+
+    async with UnitOfWork(session):
+        await load_by_id(loader, repository, 1)
+
+    repository.get_by_id.assert_awaited_once_with(1)
+    loader.load_many.assert_not_called()
@@ -0,0 +1,115 @@
+from datetime import datetime
+from uuid import uuid4
+
+import msgspec
+import pytest
+from dto import AddressRow, OrderRow, ProductRow, UserRow, to_structs
+from schemas import AddressResponse, OrderResponse, ProductResponse, UserResponse
+from tables import Address, Order, OrderItem, Product, User
+
+
+def make_rows():
+    now = datetime.now()
+    common = {"id": uuid4(), "created_at": now, "updated_at": now}
+    return [
+        (
+            User(username="dto", email="dto@example.com", **common),
+            UserRow,
+            UserResponse,
+        ),
+        (
+            Address(
+                user_id=uuid4(),
+                street="Street",
+                city="City",
+                state="State",
+                zip_code="000000",
+                country="Country",
+                is_primary=True,
+                **common,
+            ),
+            AddressRow,
+            AddressResponse,
+        ),
+        (
+            Product(name="DTO", price=9.5, category="DTO", in_stock=False, **common),
+            ProductRow,
+            ProductResponse,
+        ),
+        (
+            Order(
+                user_id=uuid4(),
+                delivery_address_id=uuid4(),
+                status="pending",
+                total_amount=0,
+                **common,
+            ),
+            OrderRow,
+            OrderResponse,
+        ),
+    ]
+
+
+@pytest.mark.parametrize("row, struct, schema", make_rows())
+def test_struct_json_matches_response_schema(row, struct, schema):
+    (converted,) = to_structs([row], struct)
+
+    assert (
+        msgspec.json.encode(converted)
+        == schema.model_validate(row).model_dump_json().encode()
+    )
+
+
+def test_order_struct_with_relations_matches_response_schema():
+    now = datetime.now()
+    product = Product(
+        id=uuid4(),
+        name="DTO",
+        price=9.5,
+        category="DTO",
+        in_stock=True,
+        created_at=now,
+        updated_at=now,
+    )
+    address = Address(
+        id=uuid4(),
+        user_id=uuid4(),
+        street="Street",
+        city="City",
+        state="State",
+        zip_code="000000",
+        country="Country",
+        is_primary=False,
+        created_at=now,
+        updated_at=now,
+    )
+    order_id = uuid4()
+    order = Order(
+        id=order_id,
+        user_id=address.user_id,
+        delivery_address_id=address.id,
+        status="paid",
+        total_amount=19.0,
+        created_at=now,
+        updated_at=now,
+        delivery_address=address,
+        order_items=[
+            OrderItem(
+                id=uuid4(),
+                order_id=order_id,
+                product_id=product.id,
+                quantity=2,
+                unit_price=9.5,
+                created_at=now,
+                product=product,
+            )
+        ],
+    )
+
+    (converted,) = to_structs([order], OrderRow)
+
+    assert converted.items[0].product.id == product.id
+    assert (
+        msgspec.json.encode(converted)
+        == OrderResponse.model_validate(order).model_dump_json().encode()
+    )
@@ -1,3 +1,6 @@
+import csv
+import io
+import json
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock
 from uuid import uuid4
@@ -20,6 +23,7 @@ class TestOrderService:
             created_at=datetime.now(),
             updated_at=datetime.now(),
             items=[],
+            address=None,
         )
         mock_repo.get_by_id.return_value = mock_order
 
@@ -42,6 +46,7 @@ class TestOrderService:
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
                 items=[],
+                address=None,
             )
         ]
         mock_repo.get_by_user_id.return_value = mock_orders
@@ -51,7 +56,7 @@ class TestOrderService:
         result = await service.get_by_user_id(user_id, 10, 1)
 
         assert len(result) == 1
-        mock_repo.get_by_user_id.assert_called_once_with(user_id, 10, 1)
+        mock_repo.get_by_user_id.assert_called_once_with(user_id, 10, 1, None, ())
 
     @pytest.mark.asyncio
     async def test_get_by_filter(self):
@@ -66,6 +71,7 @@ class TestOrderService:
                 created_at=datetime.now(),
                 updated_at=datetime.now(),
                 items=[],
+                address=None,
             )
         ]
         mock_repo.get_by_filter.return_value = mock_orders
@@ -101,6 +107,7 @@ class TestOrderService:
             created_at=datetime.now(),
             updated_at=datetime.now(),
             items=[],
+            address=None,
         )
         mock_repo.create.return_value = mock_order
 
@@ -128,6 +135,7 @@ class TestOrderService:
             created_at=datetime.now(),
             updated_at=datetime.now(),
             items=[],
+            address=None,
         )
         mock_repo.update.return_value = mock_order
 
@@ -149,6 +157,40 @@ class TestOrderService:
 
         mock_repo.delete.assert_called_once_with(order_id)
 
+    @pytest.mark.asyncio
+    async def test_export(self):
+        orders = [
+            Mock(
+                id=uuid4(),
+                user_id=uuid4(),
+                delivery_address_id=uuid4(),
+                status="pending",
+                total_amount=10.0 * i,
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+            for i in range(3)
+        ]
+
+        async def stream_by_filter(**kwargs):
+            assert kwargs == {"status": "pending"}
+            yield orders[:2]
+            yield orders[2:]
+
+        mock_repo = Mock()
+        mock_repo.stream_by_filter = stream_by_filter
+        service = OrderService(repository=mock_repo)
+
+        ndjson = "".join([c async for c in service.export("ndjson", status="pending")])
+        lines = [json.loads(line) for line in ndjson.splitlines()]
+        assert [line["id"] for line in lines] == [str(order.id) for order in orders]
+        assert lines[0]["created_at"] == orders[0].created_at.isoformat()
+
+        csv_data = "".join([c async for c in service.export("csv", status="pending")])
+        rows = list(csv.DictReader(io.StringIO(csv_data)))
+        assert len(rows) == 3
+        assert rows[1]["total_amount"] == "10.0"
+
     @pytest.mark.asyncio
     async def test_validate_order_items(self):
         service = OrderService(repository=AsyncMock())
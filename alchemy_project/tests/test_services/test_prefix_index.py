@@ -0,0 +1,153 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import prefix_index
+import pytest
+from prefix_index import PrefixIndex
+
+
+@pytest.fixture()
+def published(monkeypatch):
+    messages = []
+
+    async def fake_redis_call(action, default=None):
+        client = AsyncMock()
+        await action(client)
+        messages.append(client.publish.await_args.args)
+
+    monkeypatch.setattr(prefix_index, "redis_call", fake_redis_call)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_search_by_start_of_any_word(published):
+    index = PrefixIndex("test")
+    kettle, iron = uuid4(), uuid4()
+    await index.put_many([(kettle, "Электрический  Чайник"), (iron, "Утюг")])
+
+    assert index.search("чай") == [(kettle, "Электрический  Чайник")]
+    assert index.search(" ЭЛЕКТРИЧЕСКИЙ ча") == [(kettle, "Электрический  Чайник")]
+    assert index.search("у") == [(iron, "Утюг")]
+    assert index.search("ник") == []
+    assert index.search("  ") == []
+    assert published == [
+        (
+            index.channel,
+            json.dumps([[str(kettle), "Электрический  Чайник"], [str(iron), "Утюг"]]),
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rename_and_remove(published):
+    index = PrefixIndex("test")
+    product_id = uuid4()
+    await index.put(product_id, "Старое имя")
+    await index.put(product_id, "Новое имя")
+
+    assert index.search("стар") == []
+    assert index.search("имя") == [(product_id, "Новое имя")]
+
+    await index.remove(product_id)
+
+    assert index.search("нов") == []
+    assert len(index) == 0
+    assert index._keys == []
+
+
+@pytest.mark.asyncio
+async def test_limit_counts_products_not_keys(published):
+    index = PrefixIndex("test")
+    await index.put_many((uuid4(), f"Чай чайный {i}") for i in range(5))
+
+    assert len(index.search("чай", limit=3)) == 3
+    assert len(index.search("чай", limit=10)) == 5
+
+
+def test_message_from_other_worker_is_applied_once():
+    index = PrefixIndex("test")
+    product_id = uuid4()
+    message = json.dumps([[str(product_id), "Чайник"]])
+
+    index.on_message(message)
+    index.on_message(message)
+
+    assert index.search("ч") == [(product_id, "Чайник")]
+    assert len(index._keys) == 1
+
+    index.on_message(json.dumps([[str(product_id), None]]))
+    assert index.search("ч") == []
+
+
+@pytest.mark.asyncio
+async def test_changes_during_reload_are_kept(monkeypatch):
+    monkeypatch.setattr(prefix_index, "subscribe_channel", lambda *args: None)
+    index = PrefixIndex("test")
+    stale, deleted, created = uuid4(), uuid4(), uuid4()
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def loader():
+        loading.set()
+        await release.wait()
+        return [(stale, "Старое"), (deleted, "Удаленный")]
+
+    index.start(loader)
+    await loading.wait()
+    index.on_message(json.dumps([[str(stale), "Новое"], [str(created), "Созданный"]]))
+    index.on_message(json.dumps([[str(deleted), None]]))
+    release.set()
+    await index._load_task
+
+    assert index.search("нов") == [(stale, "Новое")]
+    assert index.search("стар") == []
+    assert index.search("удал") == []
+    assert index.search("созд") == [(created, "Созданный")]
+    await index.stop()
+
+
+@pytest.mark.asyncio
+async def test_reload_requested_during_load_runs_again(monkeypatch):
+    monkeypatch.setattr(prefix_index, "subscribe_channel", lambda *args: None)
+    index = PrefixIndex("test")
+    product_id = uuid4()
+    names = iter(["Первое", "Второе"])
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0)
+        return [(product_id, next(names))]
+
+    index.start(loader)
+    index.reload()
+    await index._load_task
+
+    assert loads == 2
+    assert index.search("втор") == [(product_id, "Второе")]
+
+
+@pytest.mark.asyncio
+async def test_large_batch_is_merged_in_one_pass(published):
+    index = PrefixIndex("test")
+    ids = [uuid4() for _ in range(200)]
+    await index.put_many((product_id, f"Товар {i}") for i, product_id in enumerate(ids))
+    keys_before = list(index._keys)
+
+    index.on_message(
+        json.dumps(
+            [[str(product_id), f"Переименован {i}"] for i, product_id in enumerate(ids)]
+            + [[str(ids[0]), None]]
+        )
+    )
+
+    assert index._keys == sorted(index._keys)
+    assert len(index._keys) == len(keys_before) - 2
+    assert index.search("товар") == []
+    assert index.search("переименован 19") == [
+        (ids[i], f"Переименован {i}") for i in [19, *range(190, 199)]
+    ]
+    assert index.search("0") == []
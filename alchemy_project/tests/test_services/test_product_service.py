@@ -1,8 +1,11 @@
 from datetime import datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 from uuid import uuid4
 
+import msgspec
 import pytest
+from dto import ProductRow
 from litestar.exceptions import NotFoundException
 from product_service import ProductService
 from schemas import ProductCreate, ProductUpdate
@@ -57,6 +60,9 @@ class TestProductService:
                 "price": 50.0,
                 "category": "Books",
                 "in_stock": True,
+                "description": None,
+                "created_at": datetime.now(),
+                "updated_at": datetime.now(),
             },
             {
                 "id": uuid4(),
@@ -64,28 +70,26 @@ class TestProductService:
                 "price": 75.0,
                 "category": "Books",
                 "in_stock": False,
+                "description": None,
+                "created_at": datetime.now(),
+                "updated_at": datetime.now(),
             },
         ]
-        mock_products = [Mock(**data) for data in products_data]
-        mock_repo.get_by_filter.return_value = mock_products
-
-        with patch("schemas.ProductResponse.model_validate") as mock_validate:
-            mock_responses = []
-            for data in products_data:
-                mock_response = Mock()
-                for key, value in data.items():
-                    setattr(mock_response, key, value)
-                mock_responses.append(mock_response)
-
-            mock_validate.side_effect = mock_responses
+        # Mock(name=...) задает имя мока, а не атрибут
+        mock_repo.get_by_filter.return_value = [
+            SimpleNamespace(**data) for data in products_data
+        ]
 
-            service = ProductService(repository=mock_repo)
-            result = await service.get_by_filter(category="Books")
+        service = ProductService(repository=mock_repo)
+        result = await service.get_by_filter(category="Books")
 
-            assert len(result) == 2
-            mock_repo.get_by_filter.assert_called_once_with(
-                count=10, page=1, category="Books"
-            )
+        assert [product.id for product in result] == [
+            data["id"] for data in products_data
+        ]
+        assert isinstance(result[0], ProductRow)
+        mock_repo.get_by_filter.assert_called_once_with(
+            count=10, page=1, category="Books"
+        )
 
     @pytest.mark.asyncio
     async def test_get_total_count(self):
@@ -126,6 +130,30 @@ class TestProductService:
             assert result.name == "New Product"
             mock_repo.create.assert_called_once_with(product_data)
 
+    @pytest.mark.asyncio
+    async def test_bulk_create_reports_invalid_rows(self):
+        mock_repo = AsyncMock()
+        created_ids = [uuid4(), uuid4()]
+        mock_repo.bulk_create.return_value = created_ids
+
+        service = ProductService(repository=mock_repo)
+        result = await service.bulk_create(
+            [
+                {"name": "Valid 1", "price": 10.0, "category": "Bulk"},
+                {"name": "Negative price", "price": -1.0, "category": "Bulk"},
+                {"name": "Valid 2", "price": 20.0, "category": "Bulk"},
+                {"price": 5.0},
+            ]
+        )
+
+        assert result.created_count == 2
+        assert result.ids == created_ids
+        assert [error.index for error in result.errors] == [1, 3]
+        assert result.errors[0].errors[0]["loc"] == ("price",)
+
+        (products,), _ = mock_repo.bulk_create.call_args
+        assert [product.name for product in products] == ["Valid 1", "Valid 2"]
+
     @pytest.mark.asyncio
     async def test_update(self):
         mock_repo = AsyncMock()
@@ -183,3 +211,42 @@ class TestProductService:
 
         with pytest.raises(NotFoundException):
             await service.delete(uuid4())
+
+    @pytest.mark.asyncio
+    async def test_get_facets_json(self):
+        mock_repo = AsyncMock()
+        mock_repo.get_facet_counts.return_value = [
+            ("Books", 0, 3),
+            ("Books", 2, 1),
+            ("Toys", 0, 4),
+            ("Games", 5, 4),
+            ("Cards", 1, 1),
+        ]
+
+        service = ProductService(repository=mock_repo)
+        with patch("redis_client.get_redis_client", AsyncMock(return_value=None)):
+            facets = msgspec.json.decode(await service.get_facets_json(in_stock=True))
+
+        mock_repo.get_facet_counts.assert_called_once_with(in_stock=True)
+        assert facets["total"] == 13
+        assert facets["filters"] == {"in_stock": True}
+        assert facets["categories"] == [
+            {"category": "Books", "count": 4},
+            {"category": "Games", "count": 4},
+            {"category": "Toys", "count": 4},
+            {"category": "Cards", "count": 1},
+        ]
+        assert [bucket["count"] for bucket in facets["price_buckets"]] == [
+            7,
+            1,
+            1,
+            0,
+            0,
+            4,
+        ]
+        assert facets["price_buckets"][0] == {
+            "price_min": 0.0,
+            "price_max": 10.0,
+            "count": 7,
+        }
+        assert facets["price_buckets"][-1]["price_max"] is None
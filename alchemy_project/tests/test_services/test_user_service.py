@@ -1,8 +1,10 @@
 from datetime import datetime
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 from uuid import uuid4
 
 import pytest
+from address_service import AddressService
+from litestar.exceptions import NotFoundException
 from schemas import UserCreate, UserUpdate
 from user_service import UserService
 
@@ -113,6 +115,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_delete(self):
         mock_repo = AsyncMock()
+        mock_repo.get_cascade_ids.return_value = ([], [])
         mock_repo.delete.return_value = True
 
         service = UserService(user_repository=mock_repo)
@@ -121,3 +124,33 @@ class TestUserService:
 
         assert result is True
         mock_repo.delete.assert_called_once_with(user_id)
+
+    @pytest.mark.asyncio
+    async def test_delete_evicts_cached_addresses(self):
+        user_id, address_id = uuid4(), uuid4()
+        address_repo = AsyncMock()
+        address_repo.get_by_id.return_value = Mock(
+            id=address_id,
+            user_id=user_id,
+            street="Main st",
+            city="City",
+            state="State",
+            zip_code="12345",
+            country="Country",
+            is_primary=True,
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+        )
+        user_repo = AsyncMock()
+        user_repo.get_cascade_ids.return_value = ([address_id], [])
+        user_repo.delete.return_value = True
+        address_service = AddressService(address_repo)
+
+        with patch("redis_client.get_redis_client", AsyncMock(return_value=None)):
+            await address_service.get_by_id(address_id)
+            await UserService(user_repository=user_repo).delete(user_id)
+
+            # Адрес удален каскадом в базе - из кэша его тоже быть не должно
+            address_repo.get_by_id.return_value = None
+            with pytest.raises(NotFoundException):
+                await address_service.get_by_id(address_id)
@@ -0,0 +1,75 @@
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+class UnitOfWork:
+    """Одна транзакция на несколько вызовов репозиториев и сервисов.
+
+    Внутри блока репозитории на этой сессии делают flush вместо commit,
+    а при выходе выполняется один commit (или rollback при исключении).
+    Действия, которые должны идти после фиксации (сброс кэша), копятся
+    в on_commit и выполняются только после успешного commit.
+
+        async with UnitOfWork(session):
+            user = await user_service.create(...)
+            address = await address_service.create(...)
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._after_commit: list[Callable[[], Awaitable[None]]] = []
+        self._token = None
+        self._outer: Optional[UnitOfWork] = None
+
+    async def __aenter__(self) -> "UnitOfWork":
+        outer = current_unit_of_work.get()
+        # Вложенный блок на той же сессии присоединяется к внешнему
+        if outer is not None and outer.session is self.session:
+            self._outer = outer
+            return outer
+        self._token = current_unit_of_work.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._outer is not None:
+            return
+
+        current_unit_of_work.reset(self._token)
+        if exc_type is not None:
+            await self.session.rollback()
+            return
+
+        try:
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        for callback in self._after_commit:
+            await callback()
+
+    def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._after_commit.append(callback)
+
+
+def active_unit_of_work(session: AsyncSession) -> Optional[UnitOfWork]:
+    """Единица работы, открытая на этой сессии, если она есть"""
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is not None and unit_of_work.session is session:
+        return unit_of_work
+    return None
+
+
+async def after_commit(callback: Callable[[], Awaitable[None]]) -> None:
+    """Выполняет callback сразу, а внутри UnitOfWork - после ее commit"""
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is None:
+        await callback()
+    else:
+        unit_of_work.on_commit(callback)
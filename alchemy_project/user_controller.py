@@ -1,44 +1,38 @@
+from typing import Optional
 from uuid import UUID
 
-from litestar import Controller, delete, get, post, put
+from dto import UsersPage
+from litestar import Controller, MediaType, Response, delete, get, post, put
 from litestar.exceptions import NotFoundException
 from litestar.params import Body, Parameter
-from schemas import UserCreate, UserResponse, UsersResponse, UserUpdate
+from pagination import CountMode, fetch_page, next_cursor
+from schemas import UserCreate, UserResponse, UserUpdate
 from user_service import UserService
-from redis_client import get_redis_client
 
 
 class UserController(Controller):
     path = "/users"
     tags = ["User Management"]
 
-    USER_CACHE_TTL = 3600  # 1 час
-    USERS_LIST_CACHE_TTL = 600  # 10 минут
-
     @get("/get_user/{user_id:uuid}")
     async def get_user_by_id(
         self, user_service: UserService, user_id: UUID
-    ) -> UserResponse:
-        """Get user by ID"""
-        cache_key = f"user:{user_id}"
-        redis_client = await get_redis_client()
-
-        cached_user = await redis_client.get(cache_key)
-        if cached_user:
-            return UserResponse.model_validate_json(cached_user)
-
-        user = await user_service.get_by_id(user_id)
+    ) -> Response[UserResponse]:
+        """Get user by ID, served as cached JSON bytes"""
+        user = await user_service.get_json_by_id(user_id)
         if not user:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
 
-        user_response = UserResponse.model_validate(user)
-        await redis_client.setex(
-            cache_key,
-            self.USER_CACHE_TTL,
-            user_response.model_dump_json()
-        )
+        return Response(user, media_type=MediaType.JSON)
 
-        return user_response
+    @get("/batch")
+    async def get_users_batch(
+        self,
+        user_service: UserService,
+        ids: list[UUID] = Parameter(min_items=1, max_items=100),
+    ) -> list[UserResponse]:
+        """Get several users by ID, unknown IDs are skipped"""
+        return await user_service.get_by_ids(ids)
 
     @get("/get_all_users")
     async def get_all_users(
@@ -46,14 +40,20 @@ class UserController(Controller):
         user_service: UserService,
         count: int = Parameter(gt=0, le=100, default=10),
         page: int = Parameter(gt=0, default=1),
-    ) -> UsersResponse:
+        cursor: Optional[str] = Parameter(default=None),
+        with_total: bool = Parameter(default=True),
+        count_mode: CountMode = Parameter(default="separate"),
+    ) -> UsersPage:
         """Get all users with pagination"""
-        users = await user_service.get_by_filter(count=count, page=page)
-        total_count = await user_service.get_total_count()
+        users, total_count, total_is_estimate = await fetch_page(
+            user_service, count, page, cursor, with_total, count_mode
+        )
 
-        return UsersResponse(
-            users=[UserResponse.model_validate(user) for user in users],
+        return UsersPage(
+            users=users,
             total_count=total_count,
+            total_is_estimate=total_is_estimate,
+            next_cursor=next_cursor(users, count),
         )
 
     @post("/create_user")
@@ -70,12 +70,9 @@ class UserController(Controller):
     async def delete_user(self, user_service: UserService, user_id: UUID) -> None:
         """Delete user"""
         success = await user_service.delete(user_id)
-        redis_client = await get_redis_client()
         if not success:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
 
-        await redis_client.delete(f"user:{user_id}")
-
     @put("/update_user/{user_id:uuid}")
     async def update_user(
         self,
@@ -84,16 +81,8 @@ class UserController(Controller):
         data: UserUpdate = Body(media_type="application/json"),
     ) -> UserResponse:
         """Update user"""
-        redis_client = await get_redis_client()
         user = await user_service.update(user_id, data)
         if not user:
             raise NotFoundException(detail=f"User with ID {user_id} not found")
 
-        user_response = UserResponse.model_validate(user)
-        await redis_client.setex(
-            f"user:{user_id}",
-            self.USER_CACHE_TTL,
-            user_response.model_dump_json()
-        )
-
         return UserResponse.model_validate(user)
@@ -1,45 +1,27 @@
+from typing import Optional
 from uuid import UUID
 
+from base_repository import BaseRepository
 from schemas import UserCreate, UserUpdate
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from tables import User
+from sqlalchemy import literal, select, union_all
+from tables import Address, Order, User
 
 
-class UserRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+class UserRepository(BaseRepository):
+    model = User
 
     async def get_by_id(self, user_id: UUID) -> User | None:
         result = await self.session.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
     async def get_by_filter(
-        self, count: int = 10, page: int = 1, **kwargs
+        self, count: int = 10, page: int = 1, cursor: Optional[str] = None, **kwargs
     ) -> list[User]:
-        offset = (page - 1) * count
-        query = select(User)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(User, key):
-                    query = query.where(getattr(User, key) == value)
-
-        query = query.offset(offset).limit(count)
+        query = self._apply_filters(select(User), **kwargs)
+        query = self._paginate(query, count, page, cursor)
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def get_total_count(self, **kwargs) -> int:
-        query = select(User)
-
-        if kwargs:
-            for key, value in kwargs.items():
-                if hasattr(User, key):
-                    query = query.where(getattr(User, key) == value)
-
-        result = await self.session.execute(select(User.id))
-        return len(result.scalars().all())
-
     async def create(self, user_data: UserCreate) -> User:
         user = User(
             username=user_data.username,
@@ -47,28 +29,32 @@ class UserRepository:
             description=user_data.description,
         )
         self.session.add(user)
-        await self.session.commit()
+        await self._commit()
         await self.session.refresh(user)
         return user
 
     async def update(self, user_id: UUID, user_data: UserUpdate) -> User:
-        user = await self.get_by_id(user_id)
-        if not user:
-            return None
-
         update_data = user_data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(user, field, value)
-
-        await self.session.commit()
-        await self.session.refresh(user)
+        user = await self._update_returning(user_id, update_data)
+        await self._commit()
         return user
 
-    async def delete(self, user_id: UUID) -> bool:
-        user = await self.get_by_id(user_id)
-        if not user:
-            return False
+    async def get_cascade_ids(self, user_id: UUID) -> tuple[list[UUID], list[UUID]]:
+        """id адресов и заказов, которые удалит ON DELETE CASCADE, одним запросом"""
+        result = await self.session.execute(
+            union_all(
+                select(literal("address"), Address.id).where(
+                    Address.user_id == user_id
+                ),
+                select(literal("order"), Order.id).where(Order.user_id == user_id),
+            )
+        )
+        address_ids, order_ids = [], []
+        for kind, entity_id in result.all():
+            (address_ids if kind == "address" else order_ids).append(entity_id)
+        return address_ids, order_ids
 
-        await self.session.delete(user)
-        await self.session.commit()
-        return True
+    async def delete(self, user_id: UUID) -> bool:
+        deleted = await self._delete_returning(user_id)
+        await self._commit()
+        return deleted
@@ -1,30 +1,89 @@
 from uuid import UUID
 
-from schemas import UserCreate, UserUpdate
+from address_service import address_cache
+from batch_loader import BatchLoader, load_by_id
+from cache import (
+    CountCache,
+    EntityCache,
+    cache_ttl,
+    cached,
+    invalidate_committed,
+    invalidates,
+    invalidates_count,
+)
+from dto import UserRow, to_structs
+from order_service import order_cache
+from pagination import unfiltered_total
+from schemas import UserCreate, UserResponse, UserUpdate
 from tables import User
 from user_repository import UserRepository
 
+user_cache = EntityCache("user", UserResponse, ttl=cache_ttl("user", 3600))
+user_count = CountCache("user", ttl=cache_ttl("user_count", 60))
+
 
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(
+        self, user_repository: UserRepository, loader: BatchLoader | None = None
+    ):
         self.user_repository = user_repository
+        self.loader = loader
+
+    @cached(user_cache)
+    async def get_by_id(self, user_id: UUID) -> UserResponse | None:
+        return await self._load(user_id)
+
+    async def get_json_by_id(self, user_id: UUID) -> bytes | None:
+        return await user_cache.get_or_load_json(user_id, lambda: self._load(user_id))
+
+    async def _load(self, user_id: UUID) -> UserResponse | None:
+        user = await load_by_id(self.loader, self.user_repository, user_id)
+        return UserResponse.model_validate(user) if user else None
 
-    async def get_by_id(self, user_id: UUID) -> User | None:
-        return await self.user_repository.get_by_id(user_id)
+    async def get_by_ids(self, user_ids: list[UUID]) -> list[UserResponse]:
+        return await user_cache.get_many_or_load(user_ids, self._load_by_ids)
+
+    async def _load_by_ids(self, user_ids: list[UUID]) -> dict[UUID, UserResponse]:
+        users = await self.user_repository.get_by_ids(user_ids)
+        return {user.id: UserResponse.model_validate(user) for user in users}
 
     async def get_by_filter(
         self, count: int = 10, page: int = 1, **kwargs
-    ) -> list[User]:
-        return await self.user_repository.get_by_filter(count, page, **kwargs)
+    ) -> list[UserRow]:
+        users = await self.user_repository.get_by_filter(count, page, **kwargs)
+        return to_structs(users, UserRow)
+
+    async def get_by_filter_with_total(
+        self, count: int = 10, page: int = 1, **kwargs
+    ) -> tuple[list[UserRow], int | None]:
+        users, total = await self.user_repository.get_by_filter_with_total(
+            count, page, **kwargs
+        )
+        return to_structs(users, UserRow), total
 
     async def get_total_count(self, **kwargs) -> int:
         return await self.user_repository.get_total_count(**kwargs)
 
+    async def get_total(self, **kwargs) -> tuple[int, bool]:
+        if kwargs:
+            return await self.get_total_count(**kwargs), False
+        return await unfiltered_total(self.user_repository, user_count)
+
+    @invalidates_count(user_count)
     async def create(self, user_data: UserCreate) -> User:
         return await self.user_repository.create(user_data)
 
+    @invalidates(user_cache)
     async def update(self, user_id: UUID, user_data: UserUpdate) -> User:
         return await self.user_repository.update(user_id, user_data)
 
+    @invalidates(user_cache)
+    @invalidates_count(user_count)
     async def delete(self, user_id: UUID) -> bool:
-        return await self.user_repository.delete(user_id)
+        # Адреса и заказы удалит ON DELETE CASCADE, их кэш сбрасываем сами
+        address_ids, order_ids = await self.user_repository.get_cascade_ids(user_id)
+        deleted = await self.user_repository.delete(user_id)
+        if deleted:
+            await invalidate_committed(address_cache, address_ids)
+            await invalidate_committed(order_cache, order_ids)
+        return deleted